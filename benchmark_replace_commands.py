@@ -0,0 +1,61 @@
+"""
+Benchmark for converting {{< command >}} blocks on a large synthetic MDX file,
+comparing the old rewrite (str.replace and a line count per block) with the offset-based splicing of CommandRule.
+"""
+import argparse
+import random
+import time
+
+from replace_commands import COMMAND_PATTERN, CommandRule, normalize_command_block
+
+
+def replace_based_apply(content):
+    """The rewrite of replace_commands.process_file before the offset-based splicing"""
+    new_content = content
+    line_numbers = []
+    for match in COMMAND_PATTERN.finditer(content):
+        line_numbers.append(content[:match.start()].count('\n') + 1)
+        new_content = new_content.replace(match.group(0), normalize_command_block(match.group(1)), 1)
+    return new_content, line_numbers
+
+
+def synthetic_mdx(blocks: int, seed: int = 0) -> str:
+    """MDX page with the given number of command blocks between paragraphs, many of the blocks are identical."""
+    rng = random.Random(seed)
+    commands = ["awslocal s3 mb s3://bucket", "awslocal sqs create-queue --queue-name queue", "localstack start -d"]
+    parts = ["---\ntitle: Synthetic page\n---\n\n"]
+    for index in range(blocks):
+        parts.append(f"Paragraph {index} " + "lorem ipsum " * rng.randint(5, 40) + "\n\n")
+        parts.append("{{< command >}}\n$ " + rng.choice(commands) + "\n{{< / command >}}\n\n")
+    return "".join(parts)
+
+
+def _measure(function, content, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = function(content)
+    return (time.perf_counter() - start) / rounds, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the conversion of command blocks on a synthetic MDX file")
+    parser.add_argument("--blocks", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="number of command blocks of the synthetic files (default: 100 1000 5000)")
+    parser.add_argument("--rounds", type=int, default=3, help="how often each file is converted (default: 3)")
+    args = parser.parse_args()
+
+    rule = CommandRule()
+    for blocks in args.blocks:
+        content = synthetic_mdx(blocks)
+        old, (old_content, old_lines) = _measure(replace_based_apply, content, args.rounds)
+        new, (new_content, changes) = _measure(rule.apply, content, args.rounds)
+        if old_content != new_content or old_lines != [change.line_number for change in changes]:
+            print(f"❌ Different output for {blocks} blocks!")
+            return 1
+        print(f"{blocks} blocks ({len(content) / 1024:.0f} KiB): "
+              f"str.replace {old * 1000:.1f} ms, splicing {new * 1000:.1f} ms ({old / new:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,252 @@
+"""
+Single-pass migration engine for the docs content.
+Walks the content tree once, reads every Markdown / MDX file once and applies all registered rules to it.
+Files are only written if a rule changed them.
+Rules are plugins (see replace_images.py and replace_commands.py), a new migration only needs a new rule.
+
+Files are enumerated through the shared content index (scripts/content_index.py), files which did not change
+since all rules last found nothing to migrate in them are skipped without being read.
+
+Every change is streamed to a JSONL changelog as soon as the file is written, with the byte offsets of the
+change before and after the rule was applied, so changelogs can be replayed or reverted (see replay_changelog.py).
+Every run writes its own timestamped changelog, runs are reverted one by one, the latest run first.
+"""
+import os
+import json
+import time
+import argparse
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from scripts.content_index import ContentIndex
+
+LOG_DIR = 'changelog'
+CHANGELOG_FILENAME = 'content_changes.jsonl'
+CONTENT_EXTENSIONS = ('.md', '.mdx')
+
+
+@dataclass
+class Change:
+    """A single replacement done by a rule, start and end are the character offsets of before in the rule input."""
+    line_number: int
+    before: str
+    after: str
+    start: int
+    end: int
+
+    def log_entry(self, filepath: str) -> str:
+        """Returns the change as a line of the plain text logs, e.g. "docs/page.md:12: <before> -> <after>"."""
+        return f"{filepath}:{self.line_number}: {self.before.strip()} -> {self.after.strip()}"
+
+
+class LineIndex:
+    """Table of the offsets at which the lines of a text start, to look up line numbers in O(log n)."""
+
+    def __init__(self, content: str):
+        self.line_starts = [0]
+        offset = content.find('\n')
+        while offset != -1:
+            self.line_starts.append(offset + 1)
+            offset = content.find('\n', offset + 1)
+
+    def line_number(self, offset: int) -> int:
+        """Returns the (1-based) line number of the character at the offset."""
+        return bisect_right(self.line_starts, offset)
+
+
+def splice(content: str, replacements: List[Tuple[int, int, str]]) -> str:
+    """
+    Replaces the spans of the content in a single pass.
+    The replacements are (start, end, text) tuples, sorted by start and not overlapping.
+    """
+    parts = []
+    position = 0
+    for start, end, text in replacements:
+        parts.append(content[position:start])
+        parts.append(text)
+        position = end
+    parts.append(content[position:])
+    return "".join(parts)
+
+
+class MigrationRule(ABC):
+    """Base class of the migration rules."""
+
+    # name of the rule on the command line
+    name = None
+    # name of the changelog (in the changelog directory) if the rule runs on its own
+    changelog_filename = CHANGELOG_FILENAME
+    # increase when the rule changes, so files it has already checked are checked again
+    version = 1
+
+    @abstractmethod
+    def apply(self, content: str) -> Tuple[str, List[Change]]:
+        """Returns the migrated content and the changes done to it (sorted by offset, not overlapping)."""
+
+
+class Changelog:
+    """
+    JSONL changelog, one record per change.
+    Offsets are byte offsets in the UTF-8 encoded file: start / end locate the before text in the file as it was
+    before the rule was applied, after_start / after_end locate the after text once the rule was applied.
+    Rules are applied one after the other, step is the position of the rule for the file.
+    The file is only created with the first record, so a run without changes leaves the changelog directory untouched.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+        self._file = None
+
+    def record(self, filepath: str, rule: MigrationRule, step: int, content: str, changes: List[Change]):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # never overwrite the changelog of an earlier run, it is needed to revert that run
+            self._file = open(self.path, 'x', encoding='utf-8')
+        byte_position = 0
+        char_position = 0
+        # difference of the byte lengths of the replaced texts so far
+        delta = 0
+        for change in changes:
+            byte_position += len(content[char_position:change.start].encode('utf-8'))
+            char_position = change.start
+            before = change.before.encode('utf-8')
+            after = change.after.encode('utf-8')
+            self._file.write(json.dumps({
+                'file': filepath,
+                'rule': rule.name,
+                'step': step,
+                'line': change.line_number,
+                'start': byte_position,
+                'end': byte_position + len(before),
+                'after_start': byte_position + delta,
+                'after_end': byte_position + delta + len(after),
+                'before': change.before,
+                'after': change.after,
+            }) + '\n')
+            delta += len(after) - len(before)
+        self.records += len(changes)
+        # keep the changelog in sync with the written files, in case the migration is interrupted
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def run_changelog_path(log_dir: str, filename: str) -> str:
+    """Returns a new changelog path for a run, e.g. changelog/image_changes-20240101-120000.jsonl"""
+    stem, extension = os.path.splitext(filename)
+    path = os.path.join(log_dir, f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}{extension}")
+    counter = 1
+    while os.path.exists(path):
+        counter += 1
+        path = os.path.join(log_dir, f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}-{counter}{extension}")
+    return path
+
+
+class MigrationEngine:
+    def __init__(self, rules: List[MigrationRule], log_dir: str = LOG_DIR, changelog_filename: str = None):
+        self.rules = list(rules)
+        self.log_dir = log_dir
+        self.changelog_filename = changelog_filename or (
+            self.rules[0].changelog_filename if len(self.rules) == 1 else CHANGELOG_FILENAME)
+        # every run gets its own changelog, see run_changelog_path
+        self.changelog_path = None
+        self.changelog = None
+        self.files_scanned = 0
+        self.files_changed = 0
+        self.files_skipped = 0
+
+    def process_file(self, filepath: str) -> List[Tuple[MigrationRule, str, List[Change]]]:
+        """Applies all rules to the file, returns (rule, rule input, changes) for every rule which changed it."""
+        # newline='' keeps the line endings as they are, so the offsets of the changelog match the bytes of the file
+        with open(filepath, 'r', encoding='utf-8', newline='') as file:
+            content = file.read()
+        self.files_scanned += 1
+
+        steps = []
+        new_content = content
+        for rule in self.rules:
+            rule_input = new_content
+            new_content, changes = rule.apply(rule_input)
+            if changes:
+                steps.append((rule, rule_input, changes))
+
+        if new_content == content:
+            return steps
+        with open(filepath, 'w', encoding='utf-8', newline='') as file:
+            file.write(new_content)
+        self.files_changed += 1
+        if self.changelog:
+            for step, (rule, rule_input, changes) in enumerate(steps):
+                self.changelog.record(filepath, rule, step, rule_input, changes)
+        return steps
+
+    def crawl_directory(self, directory: str, use_index: bool = True):
+        self.changelog_path = run_changelog_path(self.log_dir, self.changelog_filename)
+        self.changelog = Changelog(self.changelog_path)
+        try:
+            if use_index:
+                self._crawl_index(directory)
+            else:
+                for root, _, files in os.walk(directory):
+                    for filename in files:
+                        if filename.endswith(CONTENT_EXTENSIONS):
+                            self.process_file(os.path.join(root, filename))
+        finally:
+            self.changelog.close()
+        if self.changelog.records:
+            print(f"Logged {self.changelog.records} change(s) to {self.changelog_path}")
+        else:
+            print("No changes, no changelog written")
+
+    def _crawl_index(self, directory: str):
+        index = ContentIndex(directory)
+        index.refresh()
+        # files are only skipped if exactly these rules (in this version) found nothing to migrate
+        clean_tag = "migration-clean:" + ",".join(f"{rule.name}@{rule.version}" for rule in self.rules)
+        try:
+            for entry in index:
+                if entry.tags.get(clean_tag):
+                    self.files_skipped += 1
+                    continue
+                if not self.process_file(index.absolute_path(entry)):
+                    index.set_tag(entry.path, clean_tag, True)
+        finally:
+            index.save()
+
+
+def available_rules():
+    """Returns the registered rules by name."""
+    # imported here, the rule modules use the engine for their own command line
+    from replace_commands import CommandRule
+    from replace_images import ImageRule
+
+    return {rule.name: rule for rule in (ImageRule, CommandRule)}
+
+
+def main():
+    rules = available_rules()
+    parser = argparse.ArgumentParser(description="Apply content migrations to Markdown files in a single pass.")
+    parser.add_argument("directory", help="Path to the root directory to scan.")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Walk and read every file instead of using the content index.")
+    parser.add_argument("--rules", default=",".join(rules),
+                        help=f"Comma-separated list of rules to apply (default: {','.join(rules)}).")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.rules.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in rules]
+    if unknown:
+        parser.error(f"unknown rules: {', '.join(unknown)}")
+
+    engine = MigrationEngine([rules[name]() for name in selected])
+    engine.crawl_directory(args.directory, use_index=not args.no_index)
+    print(f"Changed {engine.files_changed} of {engine.files_scanned} file(s), "
+          f"skipped {engine.files_skipped} unchanged file(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Analysis of the images in public/images.
+Builds an index of all image references of the docs (Markdown images, <img> tags, Hugo figures, and the
+/images/... paths used by the components), and reports missing targets, orphaned images and byte-identical
+duplicates with the bytes which could be reclaimed per directory.
+The references of a page are cached in the content index (scripts/content_index.py), so only changed pages are read.
+"""
+import re
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from content_migration import LineIndex
+from replace_images import HUGO_FIGURE_PATTERN, IMG_PATTERN, MDX_IMG_PATTERN, extract_attributes
+from scripts.content_index import DEFAULT_CONTENT_DIR, REPO_ROOT, ContentIndex
+
+DEFAULT_PUBLIC_DIR = REPO_ROOT.joinpath("public")
+DEFAULT_SOURCE_DIR = REPO_ROOT.joinpath("src")
+IMAGES_DIR = "images"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.avif', '.ico')
+SOURCE_EXTENSIONS = ('.astro', '.tsx', '.ts', '.jsx', '.js', '.mjs', '.css')
+# increase when the extraction changes, so the cached references of the pages are dropped
+REFERENCES_TAG = "image-references@1"
+
+# standard Markdown images: ![alt](path "title")
+MARKDOWN_IMAGE_PATTERN = re.compile(r"""!\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+["'][^"']*["'])?\s*\)""")
+# /images/... paths in the components, template literals like `/images/aws/${code}.svg` are dynamic references
+SOURCE_IMAGE_PATTERN = re.compile(r"""["'`(](/images/[^"'`)\s]*)""")
+TEMPLATE_EXPRESSION_PATTERN = re.compile(r"\$\{[^}]*\}")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ImageReference:
+    # page (relative to the content directory) or source file (relative to the repository) with the reference
+    source: str
+    line_number: int
+    # the reference as written
+    target: str
+    # candidate of a template literal in a component, which might not exist
+    dynamic: bool = False
+
+
+@dataclass
+class AssetReport:
+    references: dict = field(default_factory=lambda: defaultdict(list))
+    # references which do not resolve to a file
+    missing: list = field(default_factory=list)
+    # images in public/images which are not referenced
+    orphaned: list = field(default_factory=list)
+    # lists of byte-identical images
+    duplicates: list = field(default_factory=list)
+    # directory -> bytes which can be removed (orphans and all but one copy of duplicates)
+    reclaimable: dict = field(default_factory=lambda: defaultdict(int))
+    sizes: dict = field(default_factory=dict)
+
+
+def extract_references(content: str):
+    """Yields (line number, target) of every image reference of a Markdown / MDX page."""
+    line_index = LineIndex(content)
+    for match in MARKDOWN_IMAGE_PATTERN.finditer(content):
+        yield line_index.line_number(match.start()), match.group(1)
+    for pattern in (MDX_IMG_PATTERN, IMG_PATTERN):
+        for match in pattern.finditer(content):
+            src, _ = extract_attributes(match.group(1))
+            if src:
+                # replace_images rewrites relative sources to /images/aws/...
+                yield line_index.line_number(match.start()), src if src.startswith(("/", "http")) else f"/images/aws/{src}"
+    for match in HUGO_FIGURE_PATTERN.finditer(content):
+        yield line_index.line_number(match.start()), f"/images/aws/{match.group(1)}"
+
+
+def is_local_reference(target: str) -> bool:
+    return not urlsplit(target).scheme and not target.startswith(("//", "data:", "#"))
+
+
+def resolve_reference(target: str, page_dir: Path, public_dir: Path):
+    """Resolves a local reference to a file (or None), absolute paths are served from public/ or the repository."""
+    path = unquote(urlsplit(target).path)
+    if path.startswith("/"):
+        candidates = [public_dir.joinpath(path.lstrip("/")), REPO_ROOT.joinpath(path.lstrip("/"))]
+    else:
+        candidates = [page_dir.joinpath(path), REPO_ROOT.joinpath(path)]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate.resolve()
+    return None
+
+
+def page_references(content_index: ContentIndex):
+    """Yields the references of all pages, the references of unchanged pages come from the content index."""
+    content_index.refresh()
+    for entry in content_index:
+        references = entry.tags.get(REFERENCES_TAG)
+        if references is None:
+            with open(content_index.absolute_path(entry), "r", encoding="utf-8") as f:
+                references = list(extract_references(f.read()))
+            content_index.set_tag(entry.path, REFERENCES_TAG, references)
+        for line_number, target in references:
+            yield ImageReference(entry.path, line_number, target)
+    content_index.save()
+
+
+def source_references(source_dir: Path, public_dir: Path, content_index: ContentIndex):
+    """
+    Yields the /images/... references of the components, the Astro config and the manifests in public/.
+    Dynamic references (template literals) are resolved with the image file names used in the frontmatter of the
+    pages and in src/data, e.g. `/images/aws/${tutorial.leadimage}` with the "leadimage" of the tutorials.
+    """
+    dynamic_values = set()
+    for entry in content_index:
+        dynamic_values.update(value for value in entry.frontmatter.values()
+                              if isinstance(value, str) and value.lower().endswith(IMAGE_EXTENSIONS))
+    for path in source_dir.joinpath("data").rglob("*.json"):
+        if "coverage" in path.relative_to(source_dir).parts:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            dynamic_values.update(re.findall(r'"([^"/]+\.(?:png|jpe?g|gif|svg|webp))"', f.read(), re.IGNORECASE))
+
+    source_files = [path for path in source_dir.rglob("*") if path.suffix in SOURCE_EXTENSIONS]
+    source_files += [REPO_ROOT.joinpath(name) for name in ("astro.config.mjs", "ec.config.mjs")]
+    source_files += [path for path in public_dir.rglob("*") if path.suffix in (".json", ".webmanifest")]
+    for path in source_files:
+        if not path.is_file():
+            continue
+        content = path.read_text(encoding="utf-8")
+        line_index = LineIndex(content)
+        source = path.resolve().relative_to(REPO_ROOT).as_posix()
+        for match in SOURCE_IMAGE_PATTERN.finditer(content):
+            target = match.group(1)
+            line_number = line_index.line_number(match.start())
+            if "${" not in target:
+                yield ImageReference(source, line_number, target)
+                continue
+            prefix, suffix = TEMPLATE_EXPRESSION_PATTERN.split(target, 1)
+            if suffix:
+                # e.g. `/images/aws/${serviceCode}.svg`, every matching file might be used
+                yield ImageReference(source, line_number, prefix + "*" + suffix)
+            else:
+                for value in dynamic_values:
+                    yield ImageReference(source, line_number, prefix + value, dynamic=True)
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_duplicates(paths) -> list:
+    """Returns the groups of byte-identical files, only files with the same size are hashed."""
+    by_size = defaultdict(list)
+    for path in paths:
+        by_size[path.stat().st_size].append(path)
+    by_hash = defaultdict(list)
+    for size, candidates in by_size.items():
+        if len(candidates) > 1:
+            for path in candidates:
+                by_hash[(size, file_hash(path))].append(path)
+    return [sorted(group) for group in by_hash.values() if len(group) > 1]
+
+
+def analyze(content_dir=DEFAULT_CONTENT_DIR, public_dir=DEFAULT_PUBLIC_DIR, source_dir=DEFAULT_SOURCE_DIR) -> AssetReport:
+    content_dir, public_dir, source_dir = Path(content_dir), Path(public_dir), Path(source_dir)
+    content_index = ContentIndex(content_dir)
+    report = AssetReport()
+
+    images_dir = public_dir.joinpath(IMAGES_DIR)
+    images = sorted(path.resolve() for path in images_dir.rglob("*") if path.is_file())
+    report.sizes = {path: path.stat().st_size for path in images}
+
+    referenced = set()
+    for reference in list(page_references(content_index)) + list(source_references(source_dir, public_dir, content_index)):
+        if not is_local_reference(reference.target):
+            continue
+        if "*" in reference.target:
+            pattern = re.compile(re.escape(reference.target).replace(r"\*", "[^/]+") + "$")
+            matches = [path for path in images if pattern.match("/" + path.relative_to(public_dir.resolve()).as_posix())]
+            referenced.update(matches)
+            continue
+        page_dir = content_dir.joinpath(reference.source).parent
+        resolved = resolve_reference(reference.target, page_dir, public_dir)
+        if resolved is None:
+            # dynamic references are only candidates, they are not reported as missing
+            if not reference.dynamic:
+                report.missing.append(reference)
+            continue
+        report.references[resolved].append(reference)
+        referenced.add(resolved)
+
+    report.missing.sort(key=lambda reference: (reference.source, reference.line_number))
+    report.orphaned = [path for path in images if path not in referenced]
+    report.duplicates = find_duplicates(images)
+
+    for path in report.orphaned:
+        report.reclaimable[path.parent] += report.sizes[path]
+    orphaned = set(report.orphaned)
+    for group in report.duplicates:
+        # keep one copy (preferably a referenced one), the others can be replaced by references to it
+        keep = next((path for path in group if path in referenced), group[0])
+        for path in group:
+            if path != keep and path not in orphaned:
+                report.reclaimable[path.parent] += report.sizes[path]
+    return report
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024 or unit == "MiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find missing, orphaned and duplicate images of the docs.")
+    parser.add_argument("--content-dir", default=DEFAULT_CONTENT_DIR, help="Docs content directory.")
+    parser.add_argument("--public-dir", default=DEFAULT_PUBLIC_DIR, help="Directory with the static files.")
+    parser.add_argument("--json", help="Write the report as JSON to this file.")
+    parser.add_argument("--fail-on-missing", action="store_true", help="Exit with an error if references are missing.")
+    args = parser.parse_args()
+
+    report = analyze(args.content_dir, args.public_dir)
+    public_dir = Path(args.public_dir).resolve()
+
+    def relative(path):
+        return Path(path).relative_to(public_dir).as_posix()
+
+    print(f"Missing targets ({len(report.missing)}):")
+    for reference in report.missing:
+        print(f"  {reference.source}:{reference.line_number}: {reference.target}")
+    print(f"Orphaned images ({len(report.orphaned)}, {_format_size(sum(report.sizes[p] for p in report.orphaned))}):")
+    for path in report.orphaned:
+        print(f"  {relative(path)} ({_format_size(report.sizes[path])})")
+    print(f"Duplicate images ({len(report.duplicates)} groups):")
+    for group in report.duplicates:
+        print(f"  {', '.join(relative(path) for path in group)} ({_format_size(report.sizes[group[0]])} each)")
+    print("Reclaimable per directory:")
+    for directory, size in sorted(report.reclaimable.items(), key=lambda item: -item[1]):
+        print(f"  {relative(directory)}/: {_format_size(size)}")
+    print(f"Total reclaimable: {_format_size(sum(report.reclaimable.values()))} "
+          f"of {_format_size(sum(report.sizes.values()))}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "missing": [vars(reference) for reference in report.missing],
+                "orphaned": [relative(path) for path in report.orphaned],
+                "duplicates": [[relative(path) for path in group] for group in report.duplicates],
+                "reclaimable": {relative(directory): size for directory, size in report.reclaimable.items()},
+            }, f, indent=2)
+
+    return 1 if args.fail_on_missing and report.missing else 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,163 @@
+"""
+Offline build stage for responsive image variants.
+Every raster image referenced by the docs pages (see image_assets.py) gets width-bounded, recompressed variants,
+written to an output directory together with a manifest (variants.json) of the variants per image.
+Variants are kept in a content-addressed cache (keyed by the hash of the image and the encoding parameters),
+so images which did not change are never re-encoded. Images are processed in parallel on all cores.
+Requires Pillow (pip install -r requirements.txt).
+"""
+import io
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from image_assets import DEFAULT_PUBLIC_DIR, is_local_reference, page_references, resolve_reference
+from scripts.content_index import DEFAULT_CONTENT_DIR, REPO_ROOT, ContentIndex
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed to encode the variants
+    Image = None
+
+DEFAULT_WIDTHS = (480, 960, 1600)
+DEFAULT_QUALITY = 80
+DEFAULT_OUTPUT_DIR = REPO_ROOT.joinpath("build", "image-variants")
+DEFAULT_CACHE_DIR = REPO_ROOT.joinpath("scripts", ".cache", "image-variants")
+MANIFEST_FILENAME = "variants.json"
+RASTER_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+# increase when the encoding changes, so all cached variants are encoded again
+PIPELINE_VERSION = 1
+
+
+def referenced_raster_images(content_dir=DEFAULT_CONTENT_DIR, public_dir=DEFAULT_PUBLIC_DIR) -> list:
+    """Returns the raster images in public/ which are referenced by the pages."""
+    public_dir = Path(public_dir).resolve()
+    images = set()
+    for reference in page_references(ContentIndex(content_dir)):
+        if not is_local_reference(reference.target):
+            continue
+        page_dir = Path(content_dir).joinpath(reference.source).parent
+        resolved = resolve_reference(reference.target, page_dir, public_dir)
+        if resolved and resolved.suffix.lower() in RASTER_EXTENSIONS and resolved.is_relative_to(public_dir):
+            images.add(resolved)
+    return sorted(images)
+
+
+def _encode(image, width: int, extension: str, quality: int) -> bytes:
+    height = max(1, round(image.height * width / image.width))
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        # palette images have to be converted to be resampled properly
+        image = image.convert("RGBA")
+    resized = image.resize((width, height), Image.LANCZOS)
+    output = io.BytesIO()
+    if extension in (".jpg", ".jpeg"):
+        resized.convert("RGB").save(output, "JPEG", quality=quality, optimize=True, progressive=True)
+    elif extension == ".webp":
+        resized.save(output, "WEBP", quality=quality, method=6)
+    else:
+        resized.save(output, "PNG", optimize=True)
+    return output.getvalue()
+
+
+def build_variants(path: str, widths, cache_dir: str, quality: int) -> dict:
+    """
+    Builds the variants of a single image (in a worker process).
+    Returns the original size and the (width, cache file, size, cached) of every variant smaller than the original.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    extension = Path(path).suffix.lower()
+
+    # only the header is read here, the pixels are only decoded if a variant has to be encoded
+    image = Image.open(io.BytesIO(data))
+    variants = []
+    for width in sorted(widths):
+        if width >= image.width:
+            break
+        cache_file = Path(cache_dir, digest[:2], f"{digest}-{width}w-q{quality}-v{PIPELINE_VERSION}{extension}")
+        cached = cache_file.exists()
+        if not cached:
+            encoded = _encode(image, width, extension, quality)
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # written via a temporary file, the same image might be encoded by several workers
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_bytes(encoded)
+            os.replace(tmp_file, cache_file)
+        size = cache_file.stat().st_size
+        if size < len(data):
+            variants.append((width, str(cache_file), size, cached))
+    return {"path": path, "size": len(data), "variants": variants}
+
+
+def _place(cache_file: str, target: Path):
+    """Puts a cached variant into the output directory, hard links avoid copying the data."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        target.unlink()
+    try:
+        os.link(cache_file, target)
+    except OSError:
+        shutil.copyfile(cache_file, target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive variants of the images referenced by the docs.")
+    parser.add_argument("--content-dir", default=DEFAULT_CONTENT_DIR, help="Docs content directory.")
+    parser.add_argument("--public-dir", default=DEFAULT_PUBLIC_DIR, help="Directory with the static files.")
+    parser.add_argument("-o", "--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help="Directory the variants and the manifest are written to (default: build/image-variants).")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Content-addressed cache of the encoded variants (default: scripts/.cache/image-variants).")
+    parser.add_argument("-w", "--widths", type=int, nargs="+", default=list(DEFAULT_WIDTHS),
+                        help=f"Maximum widths of the variants (default: {' '.join(map(str, DEFAULT_WIDTHS))}).")
+    parser.add_argument("-q", "--quality", type=int, default=DEFAULT_QUALITY,
+                        help=f"Quality of lossy encodings (default: {DEFAULT_QUALITY}).")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of worker processes, 0 uses all cores (default: 0).")
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow is required to build the image variants: pip install -r requirements.txt")
+        return 1
+
+    public_dir = Path(args.public_dir).resolve()
+    output_dir = Path(args.output_dir)
+    images = referenced_raster_images(args.content_dir, public_dir)
+
+    manifest = {}
+    original_bytes = variant_bytes = encoded = cached = 0
+    with ProcessPoolExecutor(max_workers=args.jobs or None) as executor:
+        results = executor.map(build_variants, map(str, images), [args.widths] * len(images),
+                               [str(args.cache_dir)] * len(images), [args.quality] * len(images))
+        for result in results:
+            source = Path(result["path"])
+            relative = source.relative_to(public_dir)
+            entries = []
+            for width, cache_file, size, was_cached in result["variants"]:
+                target = relative.with_name(f"{relative.stem}-{width}w{relative.suffix}")
+                _place(cache_file, output_dir.joinpath(target))
+                entries.append({"width": width, "path": "/" + target.as_posix(), "bytes": size})
+                cached += was_cached
+                encoded += not was_cached
+            manifest["/" + relative.as_posix()] = {"bytes": result["size"], "variants": entries}
+            original_bytes += result["size"]
+            # readers get at most the largest variant instead of the original
+            variant_bytes += entries[-1]["bytes"] if entries else result["size"]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir.joinpath(MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    saved = original_bytes - variant_bytes
+    print(f"Built variants of {len(images)} images ({encoded} encoded, {cached} from the cache) in {output_dir}")
+    print(f"Largest variants: {variant_bytes / 1024 / 1024:.1f} MiB instead of {original_bytes / 1024 / 1024:.1f} MiB, "
+          f"saved {saved / 1024 / 1024:.1f} MiB ({(saved / original_bytes * 100) if original_bytes else 0:.0f}%)")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
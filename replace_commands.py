@@ -1,66 +1,59 @@
-import os
 import re
 import argparse
 
-LOG_DIR = 'changelog'
-LOG_FILENAME = 'command_changes.log'
-LOG_PATH = os.path.join(LOG_DIR, LOG_FILENAME)
+from content_migration import Change, LineIndex, MigrationEngine, MigrationRule, splice
 
-def ensure_log_directory():
-    os.makedirs(LOG_DIR, exist_ok=True)
+CHANGELOG_FILENAME = 'command_changes.jsonl'
+
+COMMAND_PATTERN = re.compile(r'\{\{<\s*command\s*>\}\}([\s\S]*?)\{\{<\s*/\s*command\s*>\}\}', re.MULTILINE)
+PROMPT_PATTERN = re.compile(r'^\s*[$#]\s*')
 
 def normalize_command_block(command_text):
     lines = command_text.strip().splitlines()
     cleaned_lines = []
 
     for line in lines:
-        cleaned_line = re.sub(r'^\s*[$#]\s*', '', line)  # Remove leading $ or #
+        cleaned_line = PROMPT_PATTERN.sub('', line)  # Remove leading $ or #
         cleaned_lines.append(cleaned_line)
 
     return "```bash\n" + "\n".join(cleaned_lines) + "\n```"
 
-def process_file(filepath, log_entries):
-    with open(filepath, 'r', encoding='utf-8') as file:
-        content = file.read()
-
-    pattern = re.compile(r'\{\{<\s*command\s*>\}\}([\s\S]*?)\{\{<\s*/\s*command\s*>\}\}', re.MULTILINE)
-    matches = list(pattern.finditer(content))
-    if not matches:
-        return
+class CommandRule(MigrationRule):
+    """Converts Hugo {{< command >}} blocks to bash code blocks."""
 
-    new_content = content
-    for match in matches:
-        original_block = match.group(0)
-        command_text = match.group(1)
-        converted_block = normalize_command_block(command_text)
+    name = 'commands'
+    changelog_filename = CHANGELOG_FILENAME
 
-        # Determine line number of the start of the match
-        line_number = content[:match.start()].count('\n') + 1
+    def apply(self, content):
+        # cheap check before running the pattern, most files have no command blocks
+        if 'command' not in content:
+            return content, []
+        matches = list(COMMAND_PATTERN.finditer(content))
+        if not matches:
+            return content, []
 
-        new_content = new_content.replace(original_block, converted_block, 1)
+        line_index = LineIndex(content)
+        changes = []
+        replacements = []
+        for match in matches:
+            converted_block = normalize_command_block(match.group(1))
+            replacements.append((match.start(), match.end(), converted_block))
+            changes.append(Change(line_index.line_number(match.start()), match.group(0), converted_block,
+                                  match.start(), match.end()))
 
-        log_entry = f"{filepath}:{line_number}: {original_block.strip()} -> {converted_block.strip()}"
-        log_entries.append(log_entry)
+        # the output is assembled from the match spans, so identical blocks are each replaced exactly once
+        return splice(content, replacements), changes
 
-    with open(filepath, 'w', encoding='utf-8') as file:
-        file.write(new_content)
+def process_file(filepath, log_entries):
+    """
+    Converts the command blocks of a single file, a log line of every change is added to log_entries.
+    No changelog is written, the caller keeps the log entries.
+    """
+    for _, _, changes in MigrationEngine([CommandRule()]).process_file(filepath):
+        log_entries.extend(change.log_entry(filepath) for change in changes)
 
 def crawl_directory(directory):
-    ensure_log_directory()
-    log_entries = []
-
-    for root, _, files in os.walk(directory):
-        for filename in files:
-            if filename.endswith(('.md', '.mdx')):
-                filepath = os.path.join(root, filename)
-                process_file(filepath, log_entries)
-
-    # Write log file
-    with open(LOG_PATH, 'w', encoding='utf-8') as log_file:
-        for entry in log_entries:
-            log_file.write(entry + '\n')
-
-    print(f"Logged {len(log_entries)} change(s) to {LOG_PATH}")
+    MigrationEngine([CommandRule()]).crawl_directory(directory)
 
 def main():
     parser = argparse.ArgumentParser(description="Convert command blocks in Markdown files.")
@@ -70,4 +63,4 @@ def main():
     crawl_directory(args.directory)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
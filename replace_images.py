@@ -1,90 +1,79 @@
-import os
+import io
 import re
 import argparse
 
-LOG_DIR = 'changelog'
-LOG_FILENAME = 'image_changes.log'
-LOG_PATH = os.path.join(LOG_DIR, LOG_FILENAME)
+from content_migration import Change, MigrationEngine, MigrationRule
 
-def ensure_log_directory():
-    os.makedirs(LOG_DIR, exist_ok=True)
+CHANGELOG_FILENAME = 'image_changes.jsonl'
+
+SRC_PATTERN = re.compile(r'src\s*=\s*["\']([^"\']+)["\']')
+ALT_PATTERN = re.compile(r'alt\s*=\s*["\']([^"\']+)["\']')
+# MDX-wrapped <img ...> tags
+MDX_IMG_PATTERN = re.compile(
+    r"""\{\s*/\*\s*<img\s+([^>]+?)\s*/?>\s*\*/\}\s*\{\s*/\*\s*mdx-disabled\s*\*/\s*\}""")
+# raw <img ...> tags
+IMG_PATTERN = re.compile(r"""<img\s+([^>]*?)\s*/?>""")
+# Hugo-style figure tags
+HUGO_FIGURE_PATTERN = re.compile(
+    r"""\{\{<\s*figure\s+[^>]*src="([^"]+)"[^>]*alt="([^"]+)"[^>]*>\}\}""")
 
 def extract_attributes(tag: str):
     """Extracts src and alt attributes from a tag string."""
-    src_match = re.search(r'src\s*=\s*["\']([^"\']+)["\']', tag)
-    alt_match = re.search(r'alt\s*=\s*["\']([^"\']+)["\']', tag)
+    src_match = SRC_PATTERN.search(tag)
+    alt_match = ALT_PATTERN.search(tag)
     if src_match and alt_match:
         return src_match.group(1), alt_match.group(1)
     return None, None
 
+class ImageRule(MigrationRule):
+    """Converts <img> tags and Hugo figures to Markdown images, changes are recorded per line."""
+
+    name = 'images'
+    changelog_filename = CHANGELOG_FILENAME
+
+    def apply(self, content):
+        # same lines as file.readlines(), only split on \n
+        lines = io.StringIO(content).readlines()
+        changes = []
+        offset = 0
+
+        for line_number, line in enumerate(lines, start=1):
+            line_start = offset
+            offset += len(line)
+            # all patterns contain a "<", most lines can be skipped right away
+            if '<' not in line:
+                continue
+            new_line = line
+
+            for pattern in (MDX_IMG_PATTERN, IMG_PATTERN):
+                for match in pattern.finditer(new_line):
+                    src, alt = extract_attributes(match.group(1))
+                    if src and alt:
+                        new_line = new_line.replace(match.group(0), f'![{alt}](/images/aws/{src})')
+
+            for match in HUGO_FIGURE_PATTERN.finditer(new_line):
+                src = match.group(1)
+                alt = match.group(2)
+                new_line = new_line.replace(match.group(0), f'![{alt}](/images/aws/{src})')
+
+            if new_line != line:
+                lines[line_number - 1] = new_line
+                changes.append(Change(line_number, line, new_line, line_start, offset))
+
+        if not changes:
+            return content, changes
+        return "".join(lines), changes
+
 def process_file(filepath, log_entries):
-    with open(filepath, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
-
-    changed = False
-
-    for line_number, line in enumerate(lines, start=1):
-        new_line = line
-
-        # Match MDX-wrapped <img ...> tags
-        mdx_pattern = re.finditer(
-            r"""\{\s*/\*\s*<img\s+([^>]+?)\s*/?>\s*\*/\}\s*\{\s*/\*\s*mdx-disabled\s*\*/\s*\}""", new_line)
-        for match in mdx_pattern:
-            old = match.group(0)
-            attrs = match.group(1)
-            src, alt = extract_attributes(attrs)
-            if src and alt:
-                new = f'![{alt}](/images/aws/{src})'
-                new_line = new_line.replace(old, new)
-                log_entries.append(f"{filepath}:{line_number}: {old} -> {new}")
-                changed = True
-
-        # Match raw <img ...> tags
-        img_pattern = re.finditer(
-            r"""<img\s+([^>]*?)\s*/?>""", new_line)
-        for match in img_pattern:
-            old = match.group(0)
-            attrs = match.group(1)
-            src, alt = extract_attributes(attrs)
-            if src and alt:
-                new = f'![{alt}](/images/aws/{src})'
-                new_line = new_line.replace(old, new)
-                log_entries.append(f"{filepath}:{line_number}: {old} -> {new}")
-                changed = True
-
-        # Match Hugo-style figure tags
-        hugo_pattern = re.finditer(
-            r"""\{\{<\s*figure\s+[^>]*src="([^"]+)"[^>]*alt="([^"]+)"[^>]*>\}\}""", new_line)
-        for match in hugo_pattern:
-            old = match.group(0)
-            src = match.group(1)
-            alt = match.group(2)
-            new = f'![{alt}](/images/aws/{src})'
-            new_line = new_line.replace(old, new)
-            log_entries.append(f"{filepath}:{line_number}: {old} -> {new}")
-            changed = True
-
-        lines[line_number - 1] = new_line
-
-    if changed:
-        with open(filepath, 'w', encoding='utf-8') as file:
-            file.writelines(lines)
+    """
+    Converts the images of a single file, a log line of every change is added to log_entries.
+    No changelog is written, the caller keeps the log entries.
+    """
+    for _, _, changes in MigrationEngine([ImageRule()]).process_file(filepath):
+        log_entries.extend(change.log_entry(filepath) for change in changes)
 
 def crawl_directory(directory):
-    ensure_log_directory()
-    log_entries = []
-
-    for root, _, files in os.walk(directory):
-        for filename in files:
-            if filename.endswith(('.md', '.mdx')):
-                filepath = os.path.join(root, filename)
-                process_file(filepath, log_entries)
-
-    with open(LOG_PATH, 'w', encoding='utf-8') as log_file:
-        for entry in log_entries:
-            log_file.write(entry + '\n')
-
-    print(f"Logged {len(log_entries)} change(s) to {LOG_PATH}")
+    MigrationEngine([ImageRule()]).crawl_directory(directory)
 
 def main():
     parser = argparse.ArgumentParser(description="Update image syntax in Markdown files.")
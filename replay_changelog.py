@@ -0,0 +1,82 @@
+"""
+Replays or reverts a JSONL changelog written by the content migrations (content_migration.py).
+Changes are applied by their recorded byte offsets, no pattern is searched again. Before a file is touched,
+every change is verified against its content, files which do not match the changelog are skipped as a whole.
+Every migration run writes its own changelog, to revert several runs revert their changelogs latest first.
+"""
+import json
+import argparse
+from collections import defaultdict
+from itertools import groupby
+
+
+def load_changelog(path):
+    """Returns the changelog records by file, in the order they were recorded."""
+    records = defaultdict(list)
+    with open(path, 'r', encoding='utf-8') as changelog:
+        for line in changelog:
+            if line.strip():
+                record = json.loads(line)
+                records[record['file']].append(record)
+    return records
+
+
+def _apply(data: bytes, records, revert: bool) -> bytes:
+    """Applies (or reverts) the records of a single file, raises ValueError if the file does not match."""
+    steps = [list(step) for _, step in groupby(records, key=lambda record: record['step'])]
+    if revert:
+        # undo the last rule first, its offsets refer to the file after all previous rules were applied
+        steps.reverse()
+
+    for step in steps:
+        parts = []
+        position = 0
+        for record in step:
+            if revert:
+                start, end, expected, replacement = record['after_start'], record['after_end'], record['after'], record['before']
+            else:
+                start, end, expected, replacement = record['start'], record['end'], record['before'], record['after']
+            if data[start:end] != expected.encode('utf-8'):
+                raise ValueError(f"line {record['line']} ({record['rule']}) does not match the changelog")
+            parts.append(data[position:start])
+            parts.append(replacement.encode('utf-8'))
+            position = end
+        parts.append(data[position:])
+        data = b"".join(parts)
+    return data
+
+
+def replay(changelog_path, revert: bool = False, dry_run: bool = False):
+    """Replays (or reverts) the changelog, returns the number of changed and skipped files."""
+    changed = skipped = 0
+    for filepath, records in load_changelog(changelog_path).items():
+        try:
+            with open(filepath, 'rb') as file:
+                data = file.read()
+            new_data = _apply(data, records, revert)
+        except (OSError, ValueError) as e:
+            print(f"Skipped {filepath}: {e}")
+            skipped += 1
+            continue
+
+        if not dry_run:
+            with open(filepath, 'wb') as file:
+                file.write(new_data)
+        changed += 1
+    return changed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay or revert a content migration changelog.")
+    parser.add_argument("changelog", help="Path to the JSONL changelog.")
+    parser.add_argument("--revert", action="store_true", help="Revert the changes instead of replaying them.")
+    parser.add_argument("--dry-run", action="store_true", help="Only check that the changelog matches the files.")
+    args = parser.parse_args()
+
+    changed, skipped = replay(args.changelog, revert=args.revert, dry_run=args.dry_run)
+    action = "Reverted" if args.revert else "Replayed"
+    print(f"{action} changes of {changed} file(s){' (dry run)' if args.dry_run else ''}, skipped {skipped} file(s)")
+    return 1 if skipped else 0
+
+if __name__ == "__main__":
+    exit(main())
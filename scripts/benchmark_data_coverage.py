@@ -0,0 +1,160 @@
+"""
+Benchmark for the stages of create_data_coverage.py
+
+Runs the coverage pipeline stage by stage (either on existing inputs, or on synthetic inputs created with
+generate_coverage_metrics.py) and reports the wall time, throughput and peak memory of each stage.
+"""
+import contextlib
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from scripts import create_data_coverage as coverage
+from scripts.generate_coverage_metrics import generate
+
+
+class StageTimer:
+    """collects the wall time, processed items and (optionally) the peak memory of the benchmarked stages"""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    def run(self, name: str, unit: str, func, *args, **kwargs):
+        """
+        runs the stage and records its measurements
+        :param name: name of the stage
+        :param unit: what the stage processes, e.g. "rows"
+        :param func: the stage, returns a tuple of its result and the number of processed items
+        :returns: the result of the stage
+        """
+        if self.trace_memory:
+            tracemalloc.start()
+        # the pipeline prints skipped records and warnings, which would hide the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            result, items = func(*args, **kwargs)
+            wall_time = time.perf_counter() - start
+        peak_memory = None
+        if self.trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self.stages.append(
+            {
+                "stage": name,
+                "wall_time": wall_time,
+                "items": items,
+                "unit": unit,
+                "items_per_second": items / wall_time if wall_time else None,
+                "peak_memory": peak_memory,
+            }
+        )
+        return result
+
+    def print_report(self):
+        print(f"{'stage':<16} {'wall time':>10} {'items':>12} {'items/sec':>20} {'peak memory':>12}")
+        for stage in self.stages:
+            peak_memory = f"{stage['peak_memory'] / 2**20:.1f} MiB" if stage["peak_memory"] is not None else "-"
+            items_per_second = f"{stage['items_per_second']:,.0f}" if stage["items_per_second"] else "-"
+            print(
+                f"{stage['stage']:<16} {stage['wall_time']:>9.3f}s {stage['items']:>12,} "
+                f"{items_per_second + ' ' + stage['unit']:>20} {peak_memory:>12}"
+            )
+
+
+def _count_raw_metric_rows(path_to_raw_metrics: str) -> int:
+    rows = 0
+    for path in Path(path_to_raw_metrics).rglob("*.csv"):
+        with open(path, "r") as fd:
+            # the header is not a record
+            rows += sum(1 for _ in csv.reader(fd)) - 1
+    return rows
+
+
+def _load_implementation_details(path_to_implementation_details: str):
+    impl_details = coverage.load_implementation_details(path_to_implementation_details)
+    return impl_details, sum(len(operations) for operations in impl_details.values())
+
+
+def _index(path_to_raw_metrics: str, services: list[str], raw_rows: int):
+    index = coverage.index_recorded_raw_data(
+        base_dir=path_to_raw_metrics,
+        services_of_interest={coverage._metric_service_for(service) for service in services},
+    )
+    return index, raw_rows
+
+
+def _aggregate(index: dict, impl_details: dict):
+    recorded_metrics = {}
+    records = 0
+    for service, operations in impl_details.items():
+        raw_metrics = index.get(coverage._metric_service_for(service), {})
+        records += sum(len(metrics) for metrics in raw_metrics.values())
+        recorded_metrics[service] = coverage.aggregate_recorded_raw_data(raw_metrics=raw_metrics, operations=operations)
+    return recorded_metrics, records
+
+
+def _write(recorded_metrics: dict, target_dir: str, compact: bool):
+    for service, metrics in recorded_metrics.items():
+        coverage.create_data_templates_for_service(target_dir, metrics, service, compact=compact)
+    written = sum(path.stat().st_size for path in Path(target_dir).glob("*.json"))
+    return None, written
+
+
+def benchmark(
+    path_to_implementation_details: str, path_to_raw_metrics: str, trace_memory: bool = True, compact: bool = False
+) -> list[dict]:
+    """
+    benchmarks the stages of create_data_coverage.py
+    :param path_to_implementation_details: path to implementation details
+    :param path_to_raw_metrics: path to raw metrics
+    :param trace_memory: whether the peak memory of each stage is traced (slows down all stages)
+    :param compact: whether the compact data-templates are written instead of the pretty-printed ones
+    :returns: the measurements of each stage
+    """
+    timer = StageTimer(trace_memory=trace_memory)
+    raw_rows = _count_raw_metric_rows(path_to_raw_metrics)
+    impl_details = timer.run("implementation", "ops", _load_implementation_details, path_to_implementation_details)
+    index = timer.run("index", "rows", _index, path_to_raw_metrics, sorted(impl_details), raw_rows)
+    recorded_metrics = timer.run("aggregate", "rows", _aggregate, index, impl_details)
+    with tempfile.TemporaryDirectory() as target_dir:
+        timer.run("sort + write", "bytes", _write, recorded_metrics, target_dir, compact)
+    timer.print_report()
+    return timer.stages
+
+
+if __name__ == "__main__":
+    import argparse
+
+    argParser = argparse.ArgumentParser(description="benchmark the stages of create_data_coverage.py")
+    argParser.add_argument("-i", "--implementation-details", help="path to implementation details")
+    argParser.add_argument("-r", "--raw-metrics", help="path to raw metrics")
+    argParser.add_argument("--services", type=int, default=120, help="synthetic inputs: number of services")
+    argParser.add_argument("--operations", type=int, default=40, help="synthetic inputs: operations per service")
+    argParser.add_argument("--rows", type=int, default=100000, help="synthetic inputs: records per raw-metric file")
+    argParser.add_argument("--seed", type=int, default=0, help="synthetic inputs: seed for the random generator")
+    argParser.add_argument("--no-memory", action="store_true", help="do not trace the peak memory of the stages")
+    argParser.add_argument("-c", "--compact", action="store_true", help="write the compact data-templates instead of the pretty-printed ones")
+    argParser.add_argument("--json-report", help="also store the measurements in this json-file")
+
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        implementation_details, raw_metrics = args.implementation_details, args.raw_metrics
+        if not implementation_details or not raw_metrics:
+            print(f"generating synthetic inputs ({args.services} services, {args.operations} operations, {args.rows} rows per file)")
+            implementation_details, raw_metrics = generate(
+                synthetic_dir, services=args.services, operations=args.operations, rows=args.rows, seed=args.seed
+            )
+        stages = benchmark(
+            implementation_details, raw_metrics, trace_memory=not args.no_memory, compact=args.compact
+        )
+
+    if args.json_report:
+        with open(args.json_report, "w") as fd:
+            json.dump(stages, fd, indent=2)
@@ -0,0 +1,187 @@
+"""
+Persistent index of the docs content tree, shared by the docs tooling.
+Keeps path, slug, mtime, size, content hash and the parsed frontmatter of every Markdown / MDX page.
+The index is stored on disk and refreshed incrementally: only pages whose mtime or size changed are re-read.
+"""
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:  # without PyYAML only the slug is read from the frontmatter
+    yaml = None
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CONTENT_DIR = REPO_ROOT.joinpath("src", "content", "docs")
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parent.joinpath(".cache")
+INDEX_VERSION = 1
+# pages indexed without PyYAML only have the slug in their frontmatter, they are read again once it is available
+FRONTMATTER_PARSER = "yaml" if yaml is not None else "slug"
+
+CONTENT_EXTENSIONS = (".md", ".mdx")
+# the YAML header block at the start of a Markdown file
+FRONTMATTER_PATTERN = re.compile(r"\A---[ \t]*\r?\n(?P<metadata>.*?)\r?\n?^---[ \t]*$", re.DOTALL | re.MULTILINE)
+# the slug of a page, used if PyYAML is not available
+SLUG_PATTERN = re.compile(r"""^slug:[ \t]*["']?(?P<slug>[^"'\r\n]*?)["']?[ \t]*\r?$""", re.MULTILINE)
+
+
+@dataclass
+class ContentEntry:
+    """A single page of the content tree"""
+    # path relative to the content directory, with forward slashes
+    path: str
+    slug: str
+    mtime: int
+    size: int
+    sha256: str
+    frontmatter: dict = field(default_factory=dict)
+    # data attached by the tools, dropped as soon as the page changes
+    tags: dict = field(default_factory=dict)
+
+
+def slugify_segment(segment: str) -> str:
+    """Slugifies a single path segment like Starlight (github-slugger) does"""
+    segment = segment.strip().lower()
+    segment = re.sub(r"[^\w\- ]", "", segment)
+    return segment.replace(" ", "-")
+
+
+def slug_for_path(path: str) -> str:
+    """Derives the slug of a page from its path relative to the content directory"""
+    stem = path.rsplit(".", 1)[0]
+    segments = [slugify_segment(segment) for segment in stem.split("/")]
+    if segments[-1] == "index":
+        segments = segments[:-1]
+    return "/".join(segments)
+
+
+def parse_frontmatter(text: str) -> dict:
+    """
+    Parses the YAML frontmatter of a page, returns an empty dict if there is none (or it cannot be parsed).
+    Without PyYAML only the slug is parsed, so the pages are still routed correctly.
+    """
+    match = FRONTMATTER_PATTERN.match(text)
+    if not match:
+        return {}
+    if yaml is None:
+        slug = SLUG_PATTERN.search(match.group("metadata"))
+        return {"slug": slug.group("slug")} if slug else {}
+    try:
+        metadata = yaml.safe_load(match.group("metadata"))
+    except yaml.YAMLError:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def default_index_file(content_dir) -> Path:
+    """Every content directory gets its own index file"""
+    digest = hashlib.sha1(str(Path(content_dir).resolve()).encode()).hexdigest()[:12]
+    return DEFAULT_INDEX_DIR.joinpath(f"content_index-{digest}.json")
+
+
+class ContentIndex:
+    """
+    Index of the pages of a content directory.
+    Call refresh() to bring the index up to date, the pages can then be queried without touching the files.
+    """
+
+    def __init__(self, content_dir=DEFAULT_CONTENT_DIR, index_file=None):
+        self.content_dir = Path(content_dir)
+        self.index_file = Path(index_file) if index_file else default_index_file(self.content_dir)
+        self.entries: dict[str, ContentEntry] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, "r") as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if index.get("version") != INDEX_VERSION or index.get("frontmatter_parser") != FRONTMATTER_PARSER:
+            return
+        self.entries = {entry["path"]: ContentEntry(**entry) for entry in index.get("entries", [])}
+
+    def save(self):
+        """Writes the index to disk (if anything changed)"""
+        if not self._dirty:
+            return
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.index_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            # dates in the frontmatter are stored as strings
+            json.dump({"version": INDEX_VERSION, "frontmatter_parser": FRONTMATTER_PARSER,
+                       "entries": [asdict(entry) for entry in self.entries.values()]}, f, default=str)
+        os.replace(tmp_file, self.index_file)
+        self._dirty = False
+
+    def _scan(self):
+        """Yields the relative path and the stat result of every page below the content directory"""
+        stack = [str(self.content_dir)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(CONTENT_EXTENSIONS) and entry.is_file():
+                        yield Path(entry.path).relative_to(self.content_dir).as_posix(), entry.stat()
+
+    def _read_entry(self, path: str, stat: os.stat_result) -> ContentEntry:
+        with open(self.content_dir.joinpath(path), "rb") as f:
+            data = f.read()
+        frontmatter = parse_frontmatter(data.decode("utf-8", errors="replace"))
+        slug = frontmatter.get("slug")
+        return ContentEntry(
+            path=path,
+            slug=str(slug).strip("/") if slug else slug_for_path(path),
+            mtime=stat.st_mtime_ns,
+            size=stat.st_size,
+            sha256=hashlib.sha256(data).hexdigest(),
+            frontmatter=frontmatter,
+        )
+
+    def refresh(self) -> list[str]:
+        """
+        Brings the index up to date with the content directory.
+        Only pages whose mtime or size changed are read, returns the paths of the added or changed pages.
+        """
+        changed = []
+        entries = {}
+        for path, stat in self._scan():
+            entry = self.entries.get(path)
+            if entry is None or entry.mtime != stat.st_mtime_ns or entry.size != stat.st_size:
+                entry = self._read_entry(path, stat)
+                changed.append(path)
+            entries[path] = entry
+        if changed or entries.keys() != self.entries.keys():
+            self._dirty = True
+        self.entries = entries
+        self.save()
+        return changed
+
+    def get(self, path: str):
+        """Returns the entry of the page (path relative to the content directory), or None if it does not exist"""
+        return self.entries.get(path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.entries
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def absolute_path(self, entry: ContentEntry) -> str:
+        return os.path.join(str(self.content_dir), entry.path)
+
+    def set_tag(self, path: str, key: str, value):
+        """Attaches data to a page, the tags of a page are dropped when the page changes"""
+        self.entries[path].tags[key] = value
+        self._dirty = True
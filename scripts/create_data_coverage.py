@@ -2,17 +2,46 @@
 Script to generate coverage md-files for services, and related data-templates
 """
 import csv
-import os
+import hashlib
 import sys
-from pathlib import Path
 import json
 from json import JSONDecodeError
 from pathlib import Path
+import resource
 import shutil
+import time
+from collections import Counter
+from contextlib import contextmanager
 from operator import itemgetter
+from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts.service_display_names import lookup_full_name
+
+# fields of a test detail, in the order they are stored in the records of the compact data-template
+COMPACT_TEST_DETAIL_FIELDS = (
+    "node_id",
+    "test",
+    "response",
+    "error",
+    "snapshot_skipped",
+    "aws_validated",
+    "snapshot_tested",
+    "origin",
+)
+# fields of a test detail which are stored as 0/1 instead of being interned
+COMPACT_BOOLEAN_FIELDS = ("aws_validated", "snapshot_tested")
+
+
+def _data_template_file_names(service: str, compact: bool = False) -> list[str]:
+    """returns the names of all files written by create_data_templates_for_service for the service"""
+    if compact:
+        return [f"{service}.summary.json", f"{service}.compact.json"]
+    return [f"{service}.json"]
+
 
 def create_data_templates_for_service(
-    target_dir: str, metrics: dict, service: str, delete_if_exists: bool = False
+    target_dir: str, metrics: dict, service: str, delete_if_exists: bool = False, compact: bool = False
 ):
     """
     Creates the data-template for a service.
@@ -20,6 +49,8 @@ def create_data_templates_for_service(
     :param metrics: the collected metrics for the service
     :param service: name of the service
     :param delete_if_exists: checks if the target_dir exists and deletes it before creating new md-files. default: False
+    :param compact: instead of the data-template, write a summary (without details) and a compact form of the
+        data-template, see _compact_data_template. default: False
     """
     output = {}
     details = metrics.pop("details", {})
@@ -68,17 +99,94 @@ def create_data_templates_for_service(
 
     dirpath.mkdir(parents=True, exist_ok=True)
 
-    file_name = dirpath.joinpath(f"{service}.json")
-    with open(file_name, "w") as fd:
-        json.dump(output, fd, indent=2)
+    # files of the other format are removed, so the directory never holds outdated data-templates of the service
+    for file_name in _data_template_file_names(service, not compact):
+        dirpath.joinpath(file_name).unlink(missing_ok=True)
 
+    if compact:
+        summary = {key: value for key, value in output.items() if key != "details"}
+        with open(dirpath.joinpath(f"{service}.summary.json"), "w") as fd:
+            json.dump(summary, fd, separators=(",", ":"))
+        with open(dirpath.joinpath(f"{service}.compact.json"), "w") as fd:
+            json.dump(_compact_data_template(output), fd, separators=(",", ":"))
+    else:
+        file_name = dirpath.joinpath(f"{service}.json")
+        with open(file_name, "w") as fd:
+            json.dump(output, fd, indent=2)
 
-def main(
-    path_to_implementation_details: str,
-    path_to_raw_metrics: str,
-    target_dir: str,
-    service_lookup_details: str = None,
-):
+
+def _compact_data_template(output: dict) -> dict:
+    """
+    Converts a data-template into its compact form. All values of the test details (the response codes and strings)
+    are interned in the "strings" table, and every test detail is stored as a list in the order of "fields":
+        {"service": "sqs",
+         ...
+         "strings": ["LocalStack Pro: tests/test_sqs.py::test_send_message", "test_send_message", "200", ...],
+         "fields": ["node_id", "test", "response", ...],
+         "details": {"SendMessage": {"MessageBody, QueueUrl": {"ls_pro": [[0, 1, 2, 3, 3, 1, 1, 4], ...]}}}
+        }
+    where interned values are referenced by their index in the table, and booleans are stored as 0/1.
+    :param output: the data-template as written by create_data_templates_for_service
+    :returns: the compact data-template, with the same order of operations, parameters and tests
+    """
+    strings = {}
+
+    def _encode(value):
+        if isinstance(value, bool):
+            return int(value)
+        return strings.setdefault(value, len(strings))
+
+    details = {}
+    for operation, params in output["details"].items():
+        details[operation] = {
+            param: {
+                test_suite: [
+                    [_encode(test_detail[field]) for field in COMPACT_TEST_DETAIL_FIELDS] for test_detail in test_list
+                ]
+                for test_suite, test_list in test_suites.items()
+            }
+            for param, test_suites in params.items()
+        }
+
+    compact = {key: value for key, value in output.items() if key != "details"}
+    compact["strings"] = list(strings)
+    compact["fields"] = list(COMPACT_TEST_DETAIL_FIELDS)
+    compact["details"] = details
+    return compact
+
+
+def expand_compact_data_template(compact: dict) -> dict:
+    """
+    Converts a compact data-template (see _compact_data_template) back into the data-template.
+    :param compact: the compact data-template
+    :returns: the data-template, as written by create_data_templates_for_service without compact
+    """
+    strings = compact["strings"]
+    fields = compact["fields"]
+
+    def _decode(field, value):
+        return bool(value) if field in COMPACT_BOOLEAN_FIELDS else strings[value]
+
+    output = {key: value for key, value in compact.items() if key not in ("strings", "fields", "details")}
+    output["details"] = {
+        operation: {
+            param: {
+                test_suite: [dict(zip(fields, map(_decode, fields, record))) for record in records]
+                for test_suite, records in test_suites.items()
+            }
+            for param, test_suites in params.items()
+        }
+        for operation, params in compact["details"].items()
+    }
+    return output
+
+
+def load_implementation_details(path_to_implementation_details: str) -> dict:
+    """
+    loads the implementation-details of all services and operations
+    :param path_to_implementation_details: directory with the "pro" and "community" implementation_coverage_full.csv
+    :returns: dict with the implementation-details per service and operation
+    """
     impl_details = {}
     # read the implementation-details for pro + community first and generate a dict
     # with information about all services and operation, and indicator if those are implemented, and available only in pro:
@@ -121,29 +229,405 @@ def main(
                 service.setdefault(row["operation"], {"implemented": True})
                 service[row["operation"]]["pro"] = False
 
+    return impl_details
+
+
+def main(
+    path_to_implementation_details: str,
+    path_to_raw_metrics: str,
+    target_dir: str,
+    service_lookup_details: str = None,
+    jobs: int = 1,
+    manifest_file: str = None,
+    previous_dir: str = None,
+    compact: bool = False,
+    profile: bool = False,
+):
+    # collects the timings, row counts and skipped records of the run, only written with profile=True
+    profile_report = {"stages": {}, "rows": Counter(), "services": {}}
+
+    with _profile_stage(profile_report, "load_implementation_details"):
+        impl_details = load_implementation_details(path_to_implementation_details)
     services = sorted(impl_details.keys())
 
-    for service in services:
-        # special handling for rds/neptune/docdb: the services "neptune" + "docdb" are recognized as "rds" calls
-        check_service = service
-        if service in ["neptune", "docdb"]:
-            check_service = "rds"
-
-        services_of_interest = [check_service]
-        if service == "sqs":
-            # also collect all metrics for "sqs-query" and add to the service
-            services_of_interest.append("sqs-query")
-        
-        # now check the actual recorded test data and map the information
-        recorded_metrics = aggregate_recorded_raw_data(
-            base_dir=path_to_raw_metrics,
-            operations=impl_details.get(service),
-            services_of_interest=services_of_interest,
+    def display_name(service: str) -> str:
+        # the display names are only used for the log and the profile, the data-templates are not affected
+        return lookup_full_name(service, service_lookup_details) if service_lookup_details else service
+
+    if manifest_file:
+        # only re-aggregate the services whose inputs changed since the last run
+        with _profile_stage(profile_report, "index_raw_metrics"):
+            raw_metrics_index, services_to_update, manifest = index_changed_raw_data(
+                base_dir=path_to_raw_metrics,
+                impl_details=impl_details,
+                manifest=_load_manifest(manifest_file),
+                previous_dir=previous_dir,
+                compact=compact,
+                stats=profile_report["rows"],
+            )
+        print(f"re-aggregating {len(services_to_update)} of {len(services)} services")
+        for service in sorted(services_to_update):
+            print(f"  {display_name(service)}")
+        with _profile_stage(profile_report, "copy_unchanged"):
+            data_dir = Path(target_dir, "data")
+            data_dir.mkdir(parents=True, exist_ok=True)
+            # the previous data-templates might already be in the output directory, e.g. for repeated local runs
+            in_place = Path(previous_dir).resolve() == data_dir.resolve()
+            for service in services:
+                if service not in services_to_update and not in_place:
+                    # unchanged coverage files are copied through untouched
+                    for file_name in _data_template_file_names(service, compact):
+                        shutil.copyfile(Path(previous_dir, file_name), data_dir.joinpath(file_name))
+    else:
+        # read all raw metrics once, grouped by the service and operation they are relevant for
+        with _profile_stage(profile_report, "index_raw_metrics"):
+            raw_metrics_index = index_recorded_raw_data(
+                base_dir=path_to_raw_metrics,
+                services_of_interest={_metric_service_for(service) for service in services},
+                stats=profile_report["rows"],
+            )
+        services_to_update = services
+
+    service_args = [
+        (
+            target_dir + "/data",
+            raw_metrics_index.get(_metric_service_for(service), {}),
+            impl_details.get(service),
+            service,
+            compact,
         )
+        for service in services
+        if service in services_to_update
+    ]
+
+    with _profile_stage(profile_report, "aggregate_and_write"):
+        if jobs == 1:
+            service_profiles = [_create_coverage_for_service(*args) for args in service_args]
+        elif service_args:
+            # every service is aggregated and written independently, each worker only receives the metrics of its service
+            with ProcessPoolExecutor(max_workers=jobs or None) as executor:
+                service_profiles = list(executor.map(_create_coverage_for_service, *zip(*service_args)))
+        else:
+            service_profiles = []
+
+    # the row counts of the services stay per service: aliases (e.g. neptune + docdb) aggregate the same rows as
+    # the service they are recorded as, the overall counts are taken once per row while indexing
+    for args, service_profile in zip(service_args, service_profiles):
+        profile_report["services"][args[3]] = dict(service_profile, full_name=display_name(args[3]))
+
+    if manifest_file:
+        # the manifest is only updated once all data-templates have been written
+        with open(manifest_file, "w") as fd:
+            json.dump(manifest, fd, indent=2)
+
+    if profile:
+        profile_report["peak_rss_children"] = _peak_rss(resource.RUSAGE_CHILDREN)
+        profile_file = Path(target_dir, "profile.json")
+        with open(profile_file, "w") as fd:
+            json.dump(profile_report, fd, indent=2)
+        print(f"profile written to {profile_file}")
+
+
+@contextmanager
+def _profile_stage(profile_report: dict, stage: str):
+    """records the wall time of a stage, and the peak memory (RSS) of the process after the stage"""
+    start = time.perf_counter()
+    yield
+    profile_report["stages"][stage] = {
+        "wall_time": time.perf_counter() - start,
+        "peak_rss": _peak_rss(resource.RUSAGE_SELF),
+    }
+
+
+def _peak_rss(who: int) -> int:
+    """returns the peak resident set size in bytes"""
+    peak_rss = resource.getrusage(who).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _create_coverage_for_service(
+    target_dir: str, raw_metrics: dict, operations: dict, service: str, compact: bool = False
+):
+    """
+    aggregates the indexed raw metrics of a single service and writes its data-template
+    :returns: the profile of the service, with timings and row counts
+    """
+    rows = Counter(records=sum(len(metrics) for metrics in raw_metrics.values()))
+    start = time.perf_counter()
+    # now check the actual recorded test data and map the information
+    recorded_metrics = aggregate_recorded_raw_data(
+        raw_metrics=raw_metrics,
+        operations=operations,
+        stats=rows,
+    )
+    aggregated = time.perf_counter()
+
+    create_data_templates_for_service(target_dir, recorded_metrics, service, compact=compact)
+    return {
+        "aggregate_time": aggregated - start,
+        "write_time": time.perf_counter() - aggregated,
+        "rows": rows,
+    }
+
+
+# raw-metric service names which are collected for another service
+# we currently have "sqs" + "sqs-query" endpoints because of different protocols
+# the resulting coverage should not care about this though
+RAW_METRIC_SERVICE_ALIASES = {"sqs-query": "sqs"}
+
+# services whose calls are recorded as calls of another service
+# the services "neptune" + "docdb" are recognized as "rds" calls
+RECORDED_AS_SERVICE = {"neptune": "rds", "docdb": "rds"}
+
+
+def _metric_service_for(service: str) -> str:
+    """returns the name under which the raw metrics for the given service are indexed"""
+    return RECORDED_AS_SERVICE.get(service, service)
+
+
+def index_recorded_raw_data(
+    base_dir: str,
+    services_of_interest: set[str],
+    paths: list[Path] = None,
+    contributions: dict = None,
+    stats: Counter = None,
+) -> dict:
+    """
+    reads every raw-metric csv-file exactly once and groups the relevant records by service and operation:
+            {"service-name":
+                {"operation-name": [("test-source", {<raw metric>}), ...]}
+            }
+    the records keep the order in which they were read, so the aggregation is independent of the grouping.
+    :param base_dir: directory where the raw-metrics csv-files are stored
+    :param services_of_interest: services (after resolving aliases) for which the records should be kept
+    :param paths: optional, only index these csv-files instead of all files in base_dir
+    :param contributions: optional dict, filled with a digest of the records of every service (including services
+        not of interest) per indexed file
+    :param stats: optional Counter, counts the read, indexed and skipped rows
+    :returns: dict with the raw metrics per service and operation
+    """
+    index = {}
+    if stats is None:
+        stats = Counter()
+    pathlist = Path(base_dir).rglob("*.csv") if paths is None else paths
+    for path in pathlist:
+        test_source = path.stem
+        contributing_services = {}
+        with open(path, "r") as csv_obj:
+            for metric in _read_raw_metrics(csv_obj):
+                stats["read"] += 1
+                service = metric.get("service")
+                service = RAW_METRIC_SERVICE_ALIASES.get(service, service)
+
+                node_id = metric.get("node_id") or metric.get("test_node_id") or ""
+                if not node_id and not test_source.startswith("k8s"):
+                    # some records do not have a node-id -> relates to requests in the background between tests
+                    # For K8s tests we do not have a node_id, so we keep those records
+                    stats["skipped_no_node_id"] += 1
+                    continue
+
+                # skip tests are marked as xfail
+                if str(metric.get("xfail", "")).lower() == "true":
+                    stats["skipped_xfail"] += 1
+                    continue
+
+                if contributions is not None:
+                    if service not in contributing_services:
+                        contributing_services[service] = hashlib.sha256()
+                    contributing_services[service].update(repr(list(metric.values())).encode())
+
+                if service not in services_of_interest:
+                    continue
+
+                stats["indexed"] += 1
+                if _is_failed_external_call(test_source, metric):
+                    # still indexed, the aggregation skips it for every service the row is relevant for
+                    stats["skipped_external_5xx"] += 1
+                operations = index.setdefault(service, {})
+                operations.setdefault(metric.get("operation"), []).append((test_source, metric))
+
+        if contributions is not None:
+            contributions[path] = {
+                service: digest.hexdigest() for service, digest in sorted(contributing_services.items())
+            }
 
-        create_data_templates_for_service(
-            target_dir + "/data", recorded_metrics, service
+    return index
+
+
+def _is_failed_external_call(test_source: str, metric: dict) -> bool:
+    """
+    some external tests (e.g seen for terraform) seem to succeed even though single operation calls fail
+    we do not include those as "passed tests"
+    """
+    is_external = not test_source.startswith(("community", "pro", "k8s"))
+    return is_external and metric.get("response_code") in ["500", "501"]
+
+
+# columns of the raw-metric csv-files used for the coverage, any other column (e.g. request_headers) is never kept
+RAW_METRIC_COLUMNS = {
+    "service",
+    "operation",
+    "parameters",
+    "response_code",
+    "response_data",
+    "exception",
+    "origin",
+    "node_id",
+    "test_node_id",
+    "xfail",
+    "aws_validated",
+    "snapshot",
+    "snapshot_skipped_paths",
+}
+
+
+def _read_raw_metrics(csv_obj) -> Iterator[dict]:
+    """
+    streams the records of a raw-metric csv-file as dicts (like csv.DictReader), but only with the RAW_METRIC_COLUMNS.
+    The header is resolved once and the values are taken by index. The (potentially large) "response_data" is only
+    kept for records with a "CommonServiceException", where it is needed to look up the actual error type.
+    :param csv_obj: the opened csv-file
+    """
+    reader = csv.reader(csv_obj)
+    header = next(reader, None)
+    if not header:
+        return
+
+    # like csv.DictReader, the last column wins if the header contains a name twice
+    positions = {name: pos for pos, name in enumerate(header) if name in RAW_METRIC_COLUMNS}
+    response_data_pos = positions.pop("response_data", None)
+    columns = list(positions.items())
+    for row in reader:
+        if not row:
+            continue
+        row_length = len(row)
+        metric = {name: row[pos] if pos < row_length else None for name, pos in columns}
+        if response_data_pos is not None and metric.get("exception") == "CommonServiceException":
+            metric["response_data"] = row[response_data_pos] if response_data_pos < row_length else None
+        yield metric
+
+
+# bump to invalidate existing manifests, e.g. when the aggregation changes
+MANIFEST_VERSION = 2
+
+
+def _load_manifest(manifest_file: str) -> dict:
+    """loads the manifest of the last run, or returns an empty one if there is no (compatible) manifest"""
+    path = Path(manifest_file)
+    if path.is_file():
+        try:
+            with open(path, "r") as fd:
+                manifest = json.load(fd)
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest
+        except JSONDecodeError:
+            print(f"WARN: ignoring invalid manifest {manifest_file}")
+    return {"version": MANIFEST_VERSION, "raw_metrics": {}, "services": {}}
+
+
+def _file_fingerprint(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for chunk in iter(lambda: fd.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _operations_fingerprint(operations: dict) -> str:
+    # the order of the operations is kept in the data-template, so it is part of the fingerprint
+    return hashlib.sha256(json.dumps(operations).encode()).hexdigest()
+
+
+def index_changed_raw_data(
+    base_dir: str,
+    impl_details: dict,
+    manifest: dict,
+    previous_dir: str = None,
+    compact: bool = False,
+    stats: Counter = None,
+) -> tuple[dict, set[str], dict]:
+    """
+    compares the raw-metric csv-files and implementation-details against the manifest of the last run, and indexes
+    the raw metrics of the services whose inputs changed. The manifest looks like this:
+            {"version": 2,
+             "raw_metrics": {"pro-integration-test/metrics.csv": {"sha256": "...", "services": {"sqs": "...", ...}}},
+             "services": {"sqs": {"operations": "..."}}
+            }
+    where "services" of a csv-file holds a digest of the records the file contributes to each service.
+    A service needs to be updated if its records in any csv-file were added, changed or removed, if its
+    operations changed, or if any of its previously generated data-templates is missing in previous_dir.
+    Unchanged csv-files are only read if they contain records for a service that needs to be updated.
+    :param base_dir: directory where the raw-metrics csv-files are stored
+    :param impl_details: the implementation-details of all services
+    :param manifest: the manifest of the last run
+    :param previous_dir: directory with the previously generated data-templates
+    :param compact: whether the compact data-templates are generated as well
+    :param stats: optional Counter, counts the read, indexed and skipped rows
+    :returns: tuple of the index (see index_recorded_raw_data), the services to update, and the new manifest
+    """
+    services = sorted(impl_details.keys())
+    metric_services = {_metric_service_for(service) for service in services}
+    previous_files = manifest["raw_metrics"]
+
+    paths = list(Path(base_dir).rglob("*.csv"))
+    keys = {path: path.relative_to(base_dir).as_posix() for path in paths}
+    files = {}
+    changed_file_indexes = {}
+    for path in paths:
+        fingerprint = _file_fingerprint(path)
+        previous = previous_files.get(keys[path])
+        if previous and previous["sha256"] == fingerprint:
+            files[keys[path]] = previous
+            continue
+        contributions = {}
+        changed_file_indexes[path] = index_recorded_raw_data(
+            base_dir, metric_services, paths=[path], contributions=contributions, stats=stats
         )
+        files[keys[path]] = {"sha256": fingerprint, "services": contributions[path]}
+
+    # services whose records in any csv-file were added, changed or removed
+    changed_metric_services = set()
+    for key in previous_files.keys() | files.keys():
+        previous_services = previous_files.get(key, {}).get("services", {})
+        current_services = files.get(key, {}).get("services", {})
+        for service in previous_services.keys() | current_services.keys():
+            if previous_services.get(service) != current_services.get(service):
+                changed_metric_services.add(service)
+
+    services_to_update = set()
+    service_entries = {}
+    for service in services:
+        fingerprint = _operations_fingerprint(impl_details[service])
+        service_entries[service] = {"operations": fingerprint}
+        if (
+            _metric_service_for(service) in changed_metric_services
+            or manifest["services"].get(service, {}).get("operations") != fingerprint
+            or not previous_dir
+            or not all(
+                Path(previous_dir, file_name).is_file() for file_name in _data_template_file_names(service, compact)
+            )
+        ):
+            services_to_update.add(service)
+
+    # merge the records of all files (in the same order as a full run) for the services to update
+    update_metric_services = {_metric_service_for(service) for service in services_to_update}
+    index = {}
+    for path in paths:
+        file_index = changed_file_indexes.get(path)
+        if file_index is None:
+            if not update_metric_services.intersection(files[keys[path]]["services"]):
+                continue
+            file_index = index_recorded_raw_data(base_dir, update_metric_services, paths=[path], stats=stats)
+        for service, file_operations in file_index.items():
+            if service not in update_metric_services:
+                continue
+            operations = index.setdefault(service, {})
+            for op_name, records in file_operations.items():
+                operations.setdefault(op_name, []).extend(records)
+
+    new_manifest = {"version": MANIFEST_VERSION, "raw_metrics": files, "services": service_entries}
+    return index, services_to_update, new_manifest
 
 
 def _init_metric_recorder(operations_dict: dict):
@@ -174,9 +658,7 @@ def _init_metric_recorder(operations_dict: dict):
     return operations
 
 
-def aggregate_recorded_raw_data(
-    base_dir: str, operations: dict, services_of_interest: list[str]
-):
+def aggregate_recorded_raw_data(raw_metrics: dict, operations: dict, stats: Counter = None):
     """
     collects all the raw metric data and maps them in a dict with information about the service, and a "details"
     that includes details about any related test.
@@ -212,172 +694,156 @@ def aggregate_recorded_raw_data(
                     }
                 }
             }
-    :param base_dir: directory where the raw-metrics csv-files are stored
+    :param raw_metrics: the indexed raw metrics of the service, see index_recorded_raw_data
     :param operations: dict
-    :param service: service of interest
+    :param stats: optional Counter, counts the skipped records
     :returns: dict with details about invoked operations
     """
     # contains internal + external calls
     recorded_data = _init_metric_recorder(operations)
-    pathlist = Path(base_dir).rglob("*.csv")
-    for path in pathlist:
-        test_source = path.stem
-        with open(path, "r") as csv_obj:
-            csv_dict_reader = csv.DictReader(csv_obj)
-            for metric in csv_dict_reader:
-                service = metric.get("service")
-                if service not in services_of_interest:
-                    continue
-
-                node_id = metric.get("node_id") or metric.get("test_node_id") or ""
-                if not node_id and not test_source.startswith("k8s"):
-                    # some records do not have a node-id -> relates to requests in the background between tests
-                    # For K8s tests we do not have a node_id, so we keep those records
-                    continue
-
-                # skip tests are marked as xfail
-                if str(metric.get("xfail", "")).lower() == "true":
-                    continue
-
-                op_name = metric.get("operation")
-                op_record = recorded_data.get(op_name)
-                if not op_record:
-                    # some operations are only "phantoms" (e.g. s3.PostObject)
-                    # and for docdb/neptune not all rds operations are available either -> we skip in that case
-                    #print(
-                    #    f"---> operation {metric.get('service')}.{metric.get('operation')} was not found"
-                    #)
-                    continue
-
-                internal_test = False
-                external_test = False
-                k8s_tested = False
-
-                if test_source.startswith("community"):
-                    test_node_origin = "LocalStack Community"
-                    internal_test = True
-                    source = "ls_community"
-                elif test_source.startswith("pro"):
-                    test_node_origin = "LocalStack Pro"
-                    internal_test = True
-                    source = "ls_pro"
-                elif test_source.startswith("k8s"):
-                    internal_test = False  # We consider it as external test to avoid adding these in test list
-                    k8s_tested = True
-                    source = "ls_pro"  # for now k8s tests are only running in pro
-                    test_node_origin = "LocalStack Pro"
-                else:
-                    external_test = True
-
-
-                if external_test and metric.get("response_code") in ["500", "501"]:
-                    # some external tests (e.g seen for terraform) seem to succeed even though single operation calls fail
-                    # we do not include those as "passed tests"
-                    print(f"skipping {service}.{op_name}: response_code {metric.get('response_code')} ({test_source})")
-                    continue 
-
-                terraform_validated = True if test_source.startswith("terraform") else False
-                if internal_test and not op_record.get("internal_test_suite"):
-                    op_record["internal_test_suite"] = True
-                if external_test and not op_record.get("external_test_suite"):
-                    op_record["external_test_suite"] = True
-                if k8s_tested and not op_record.get("k8s_test_suite"):
-                    op_record["k8s_test_suite"] = True
-
-                aws_validated = (
-                    str(metric.get("aws_validated", "false")).lower() == "true"
-                )
-
-                # snapshot_tested is set if the test uses the snapshot-fixture + does not skip everything 
-                #   (pytest.marker.skip_snapshot_verify)
-                snapshot_tested = (
-                    str(metric.get("snapshot", "false")).lower() == "true"
-                    and metric.get("snapshot_skipped_paths", "") != "all"
-                )
-
-                if snapshot_tested and not aws_validated:
-                    # the test did not have the marker aws_validated, but as it is snapshot_tested we can assume aws-validation
-                    aws_validated = True
-
-                if not op_record.get("snapshot_tested") and snapshot_tested:
-                    op_record["snapshot_tested"] = True
-                    op_record["aws_validated"] = True
-
-                if not op_record.get("aws_validated") and aws_validated:
-                    op_record["aws_validated"] = True
-
-                if not op_record.get("terraform_test_suite") and terraform_validated:
-                    op_record["terraform_test_suite"] = True
-
-                if internal_test and not op_record["implemented"]:
-                    print(f"WARN: {service}.{op_name} classified as 'not implemented', but found a test calling it: ({source}) {node_id}")
-                    op_record["implemented"] = True
-                    op_record["availability"] = "pro" if source == "ls_pro" else "community"
-                
-                # test details currently only considered for internal test suite
-                # TODO might change when we include terraform test results
-                if not internal_test:
-                    continue
-                
-                # collect test details
-                details = recorded_data.setdefault("details", {})
-                # one dict for each operation
-                details_tests = details.setdefault(op_name, {})
-
-                # grouped by parameters
-                params = metric.get("parameters", "None").split(",")
-                params.sort()
-                parameters = ", ".join(params)
-                if not parameters:
-                    parameters = "- (without any parameters)"
-                
-                param_test_details = details_tests.setdefault(parameters, {})
-
-                # separate lists for source ("ls_community" and "ls_pro")
-                test_list = param_test_details.setdefault(source, [])
-
-                if param_exception := metric.get("exception", ""):
-                    if param_exception == "CommonServiceException":
-                        # try to get more details about the CommonServiceException from the response
-                        try:
-                            data = json.loads(metric.get("response_data", "{}"))
-                            param_exception = data.get("__type", param_exception)
-                        except JSONDecodeError:
-                            # in this case we just keep the original "CommonServiceException" information
-                            pass
-
-                # get simple test name (will be shown on coverage page)
-                if node_id.endswith("]"):
-                    # workaround for tests that have a "::" as part of a parameterized test
-                    # e.g. tests/integration/mytest.py::SomeTest::test_and_or_functions[Fn::Or-0-0-False]
-                    tmp = node_id[0 : node_id.rfind("[")].split("::")[-1]
-                    simple_test_name = tmp + node_id[node_id.rfind("[") :]
-                else:
-                    simple_test_name = node_id.split("::")[-1]
-                test_detail = {
-                    "node_id": f"{test_node_origin}: {node_id}",
-                    "test": simple_test_name,
-                    "response": metric.get("response_code", -1),
-                    "error": param_exception,
-                    "snapshot_skipped": metric.get("snapshot_skipped_paths", ""),
-                    "aws_validated": aws_validated,
-                    "snapshot_tested": snapshot_tested,
-                    "origin": metric.get("origin", ""),
-                }
-                if test_detail not in test_list:
-                    # avoid duplicates
-                    test_list.append(test_detail)
+    # keys of the test details already collected per (operation, parameters, source), to avoid duplicates
+    seen_test_details = {}
+    for op_name, metrics in raw_metrics.items():
+        op_record = recorded_data.get(op_name)
+        if not op_record:
+            # some operations are only "phantoms" (e.g. s3.PostObject)
+            # and for docdb/neptune not all rds operations are available either -> we skip in that case
+            #print(
+            #    f"---> operation {op_name} was not found"
+            #)
+            if stats is not None:
+                stats["skipped_phantom_operation"] += len(metrics)
+            continue
+
+        for test_source, metric in metrics:
+            service = metric.get("service")
+            node_id = metric.get("node_id") or metric.get("test_node_id") or ""
+
+            internal_test = False
+            external_test = False
+            k8s_tested = False
+
+            if test_source.startswith("community"):
+                test_node_origin = "LocalStack Community"
+                internal_test = True
+                source = "ls_community"
+            elif test_source.startswith("pro"):
+                test_node_origin = "LocalStack Pro"
+                internal_test = True
+                source = "ls_pro"
+            elif test_source.startswith("k8s"):
+                internal_test = False  # We consider it as external test to avoid adding these in test list
+                k8s_tested = True
+                source = "ls_pro"  # for now k8s tests are only running in pro
+                test_node_origin = "LocalStack Pro"
+            else:
+                external_test = True
+
+
+            if _is_failed_external_call(test_source, metric):
+                print(f"skipping {service}.{op_name}: response_code {metric.get('response_code')} ({test_source})")
+                if stats is not None:
+                    stats["skipped_external_5xx"] += 1
+                continue 
+
+            terraform_validated = True if test_source.startswith("terraform") else False
+            if internal_test and not op_record.get("internal_test_suite"):
+                op_record["internal_test_suite"] = True
+            if external_test and not op_record.get("external_test_suite"):
+                op_record["external_test_suite"] = True
+            if k8s_tested and not op_record.get("k8s_test_suite"):
+                op_record["k8s_test_suite"] = True
+
+            aws_validated = (
+                str(metric.get("aws_validated", "false")).lower() == "true"
+            )
+
+            # snapshot_tested is set if the test uses the snapshot-fixture + does not skip everything 
+            #   (pytest.marker.skip_snapshot_verify)
+            snapshot_tested = (
+                str(metric.get("snapshot", "false")).lower() == "true"
+                and metric.get("snapshot_skipped_paths", "") != "all"
+            )
+
+            if snapshot_tested and not aws_validated:
+                # the test did not have the marker aws_validated, but as it is snapshot_tested we can assume aws-validation
+                aws_validated = True
+
+            if not op_record.get("snapshot_tested") and snapshot_tested:
+                op_record["snapshot_tested"] = True
+                op_record["aws_validated"] = True
+
+            if not op_record.get("aws_validated") and aws_validated:
+                op_record["aws_validated"] = True
+
+            if not op_record.get("terraform_test_suite") and terraform_validated:
+                op_record["terraform_test_suite"] = True
+
+            if internal_test and not op_record["implemented"]:
+                print(f"WARN: {service}.{op_name} classified as 'not implemented', but found a test calling it: ({source}) {node_id}")
+                op_record["implemented"] = True
+                op_record["availability"] = "pro" if source == "ls_pro" else "community"
+            
+            # test details currently only considered for internal test suite
+            # TODO might change when we include terraform test results
+            if not internal_test:
+                continue
+            
+            # collect test details
+            details = recorded_data.setdefault("details", {})
+            # one dict for each operation
+            details_tests = details.setdefault(op_name, {})
+
+            # grouped by parameters
+            params = metric.get("parameters", "None").split(",")
+            params.sort()
+            parameters = ", ".join(params)
+            if not parameters:
+                parameters = "- (without any parameters)"
+            
+            param_test_details = details_tests.setdefault(parameters, {})
+
+            # separate lists for source ("ls_community" and "ls_pro")
+            test_list = param_test_details.setdefault(source, [])
+
+            if param_exception := metric.get("exception", ""):
+                if param_exception == "CommonServiceException":
+                    # try to get more details about the CommonServiceException from the response
+                    try:
+                        data = json.loads(metric.get("response_data", "{}"))
+                        param_exception = data.get("__type", param_exception)
+                    except JSONDecodeError:
+                        # in this case we just keep the original "CommonServiceException" information
+                        pass
+
+            # get simple test name (will be shown on coverage page)
+            if node_id.endswith("]"):
+                # workaround for tests that have a "::" as part of a parameterized test
+                # e.g. tests/integration/mytest.py::SomeTest::test_and_or_functions[Fn::Or-0-0-False]
+                tmp = node_id[0 : node_id.rfind("[")].split("::")[-1]
+                simple_test_name = tmp + node_id[node_id.rfind("[") :]
+            else:
+                simple_test_name = node_id.split("::")[-1]
+            test_detail = {
+                "node_id": f"{test_node_origin}: {node_id}",
+                "test": simple_test_name,
+                "response": metric.get("response_code", -1),
+                "error": param_exception,
+                "snapshot_skipped": metric.get("snapshot_skipped_paths", ""),
+                "aws_validated": aws_validated,
+                "snapshot_tested": snapshot_tested,
+                "origin": metric.get("origin", ""),
+            }
+            # avoid duplicates, all test details share the same keys so the values identify the test detail
+            seen = seen_test_details.setdefault((op_name, parameters, source), set())
+            test_detail_key = tuple(test_detail.values())
+            if test_detail_key not in seen:
+                seen.add(test_detail_key)
+                test_list.append(test_detail)
 
     return recorded_data
 
 
-def print_usage():
-    print("missing arguments")
-    print(
-        "usage: python create_data_coverage.py <dir-to-implementation-details> <dir-to-raw-csv-metric> <target-dir>"
-    )
-
-
 if __name__ == "__main__":
     import argparse
 
@@ -385,21 +851,41 @@ if __name__ == "__main__":
     argParser.add_argument("-i", "--implementation-details", required=True, help="path to implementation details")
     argParser.add_argument("-r", "--raw-metrics", required=True, help="path to raw metrics")
     argParser.add_argument("-o", "--output-dir", required=True, help="directory where the generated files will be stored")
-    argParser.add_argument("-s", "--service-details-json", help="path to service_display_name.json")
+    argParser.add_argument(
+        "-s", "--service-details-json",
+        help="path to service_display_name.json, used for the display names in the log and the profile",
+    )
+    argParser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of processes used to aggregate and write the services (default: 1, 0 uses all cores)",
+    )
+    argParser.add_argument(
+        "-m", "--manifest",
+        help="path to the manifest of the last run, only services with changed inputs are re-aggregated",
+    )
+    argParser.add_argument(
+        "-p", "--previous-dir",
+        help="directory with the previously generated data-templates, copied through for unchanged services",
+    )
+    argParser.add_argument(
+        "-c", "--compact", action="store_true",
+        help="write a summary and a compact form of each data-template instead of the pretty-printed data-template",
+    )
+    argParser.add_argument(
+        "--profile", action="store_true",
+        help="write timings, row counts and skipped records per stage and service to <output-dir>/profile.json",
+    )
 
     args = argParser.parse_args()
 
-    path_to_implementation_details = args.implementation_details
-    path_to_raw_metrics = sys.argv[2]
-    target_dir = sys.argv[3]
-    service_lookup_details = None
-
-    if len(sys.argv) == 5:
-        # optional parameter, path to service_display_name.json
-        service_lookup_details = sys.argv[4]
     main(
         path_to_implementation_details=args.implementation_details,
         path_to_raw_metrics=args.raw_metrics,
         target_dir=args.output_dir,
         service_lookup_details=args.service_details_json,
+        jobs=args.jobs,
+        manifest_file=args.manifest,
+        previous_dir=args.previous_dir,
+        compact=args.compact,
+        profile=args.profile,
     )
@@ -0,0 +1,188 @@
+"""
+Script to generate synthetic implementation-details and raw-metric csv-files for create_data_coverage.py
+
+The real inputs are only available as CI artifacts, the generated files follow the same schemas and contain the same
+kind of special records (xfail tests, records without node-id, CommonServiceExceptions, 5xx responses in external
+test suites, phantom operations, and the sqs-query/neptune/docdb aliases), so the coverage pipeline can be run and
+benchmarked offline.
+"""
+import csv
+import json
+import random
+from pathlib import Path
+
+IMPLEMENTATION_DETAILS_COLUMNS = ["service", "operation", "is_implemented"]
+
+RAW_METRIC_COLUMNS = [
+    "service",
+    "operation",
+    "request_headers",
+    "parameters",
+    "response_code",
+    "response_data",
+    "exception",
+    "origin",
+    "test_node_id",
+    "xfail",
+    "aws_validated",
+    "snapshot",
+    "snapshot_skipped_paths",
+]
+
+# prefixes of the raw-metric artifacts, as downloaded by the docs-parity-updates workflow
+RAW_METRIC_SOURCES = [
+    "community-integration-test",
+    "pro-integration-test",
+    "k8s-acceptance-test",
+    "k8s-integration-test",
+    "k8s-community-integration-test",
+    "moto-integration-test",
+    "terraform",
+]
+
+# services which are handled specially by create_data_coverage.py
+SPECIAL_SERVICES = ["sqs", "sqs-query", "rds", "neptune", "docdb"]
+
+PARAMETERS = ["Name", "Tags", "MaxResults", "NextToken", "Attributes", "Description", "Filters", "ClientToken"]
+EXCEPTIONS = ["ValidationException", "ResourceNotFoundException", "AccessDeniedException"]
+
+
+def _service_operations(services: int, operations: int) -> dict[str, list[str]]:
+    service_names = SPECIAL_SERVICES + [f"service{i}" for i in range(max(services - len(SPECIAL_SERVICES), 0))]
+    result = {}
+    for service in service_names[: max(services, len(SPECIAL_SERVICES))]:
+        if service == "sqs-query":
+            # the same operations as "sqs", but another protocol
+            result[service] = [f"Operation{i}" for i in range(operations)]
+        elif service in ("neptune", "docdb"):
+            # only a subset of the rds operations are available
+            result[service] = [f"Operation{i}" for i in range(0, operations, 2)]
+        else:
+            result[service] = [f"Operation{i}" for i in range(operations)]
+    return result
+
+
+def _write_implementation_details(target_dir: Path, service_operations: dict, rnd: random.Random):
+    for edition, implemented_ratio in (("pro", 0.9), ("community", 0.6)):
+        edition_dir = target_dir.joinpath(edition)
+        edition_dir.mkdir(parents=True, exist_ok=True)
+        with open(edition_dir.joinpath("implementation_coverage_full.csv"), "w", newline="") as fd:
+            writer = csv.writer(fd)
+            writer.writerow(IMPLEMENTATION_DETAILS_COLUMNS)
+            for service, operations in service_operations.items():
+                for operation in operations:
+                    writer.writerow([service, operation, str(rnd.random() < implemented_ratio)])
+
+
+def _raw_metric_row(service: str, operation: str, source: str, rnd: random.Random) -> list[str]:
+    internal = source.startswith(("community", "pro"))
+    test_node_id = ""
+    if not source.startswith("k8s") and rnd.random() > 0.05:
+        # records without node-id are background requests between tests (k8s records never have one)
+        test_file = f"tests/aws/services/{service}/test_{service.replace('-', '_')}.py"
+        test_name = f"test_{operation.lower()}_{rnd.randrange(50)}"
+        if rnd.random() < 0.3:
+            # parametrized tests, including "::" inside of the parameters
+            test_name += f"[Fn::Or-{rnd.randrange(4)}]"
+        test_node_id = f"{test_file}::Test{service.title().replace('-', '')}::{test_name}"
+
+    exception = ""
+    response_data = json.dumps({"Result": "x" * rnd.randrange(64, 512)})
+    response_code = "200"
+    if rnd.random() < 0.2:
+        exception = rnd.choice(EXCEPTIONS + ["CommonServiceException"])
+        response_code = "400"
+        if exception == "CommonServiceException":
+            # the actual error type is part of the response, which is not always valid json
+            response_data = json.dumps({"__type": rnd.choice(EXCEPTIONS)}) if rnd.random() < 0.9 else "<invalid>"
+    elif not internal and rnd.random() < 0.05:
+        # operations failing in external test suites
+        response_code = rnd.choice(["500", "501"])
+
+    parameters = rnd.sample(PARAMETERS, rnd.randrange(0, 4))
+    snapshot = rnd.random() < 0.5
+    return [
+        service,
+        operation,
+        json.dumps({"User-Agent": "synthetic", "Content-Type": "application/json"}),
+        ",".join(parameters),
+        response_code,
+        response_data,
+        exception,
+        "internal" if internal else "external",
+        test_node_id,
+        "True" if rnd.random() < 0.03 else "False",
+        str(rnd.random() < 0.4),
+        str(snapshot),
+        rnd.choice(["", "", "all", "$..ResponseMetadata"]) if snapshot else "",
+    ]
+
+
+def _write_raw_metrics(
+    target_dir: Path, service_operations: dict, rows: int, files_per_source: int, rnd: random.Random
+):
+    services = list(service_operations)
+    for source in RAW_METRIC_SOURCES:
+        for file_number in range(files_per_source):
+            artifact_dir = target_dir.joinpath(f"{source}-{file_number}")
+            artifact_dir.mkdir(parents=True, exist_ok=True)
+            with open(artifact_dir.joinpath(f"{source}-{file_number}.csv"), "w", newline="") as fd:
+                writer = csv.writer(fd)
+                writer.writerow(RAW_METRIC_COLUMNS)
+                for _ in range(rows):
+                    service = rnd.choice(services)
+                    if service in ("neptune", "docdb"):
+                        # calls are recorded as rds calls
+                        service = "rds"
+                    if rnd.random() < 0.01:
+                        # phantom operations which are not part of the implementation-details
+                        operation = "PhantomOperation"
+                    else:
+                        operation = rnd.choice(service_operations[service])
+                    writer.writerow(_raw_metric_row(service, operation, source, rnd))
+
+
+def generate(
+    output_dir: str, services: int, operations: int, rows: int, files_per_source: int = 1, seed: int = 0
+) -> tuple[str, str]:
+    """
+    generates synthetic inputs for create_data_coverage.py
+    :param output_dir: directory where the files will be stored
+    :param services: number of services (at least the specially handled services are generated)
+    :param operations: number of operations per service
+    :param rows: number of records per raw-metric csv-file
+    :param files_per_source: number of raw-metric csv-files per test source (community, pro, k8s, ...)
+    :param seed: seed for the random generator, the same parameters always generate the same files
+    :returns: tuple of the implementation-details and the raw-metrics directories
+    """
+    rnd = random.Random(seed)
+    service_operations = _service_operations(services, operations)
+    implementation_details_dir = Path(output_dir, "metrics-implementation-details")
+    raw_metrics_dir = Path(output_dir, "metrics-raw")
+    _write_implementation_details(implementation_details_dir, service_operations, rnd)
+    _write_raw_metrics(raw_metrics_dir, service_operations, rows, files_per_source, rnd)
+    return str(implementation_details_dir), str(raw_metrics_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    argParser = argparse.ArgumentParser(description="generate synthetic inputs for create_data_coverage.py")
+    argParser.add_argument("-o", "--output-dir", required=True, help="directory where the generated files will be stored")
+    argParser.add_argument("--services", type=int, default=120, help="number of services (default: 120)")
+    argParser.add_argument("--operations", type=int, default=40, help="number of operations per service (default: 40)")
+    argParser.add_argument("--rows", type=int, default=100000, help="number of records per raw-metric file (default: 100000)")
+    argParser.add_argument("--files-per-source", type=int, default=1, help="raw-metric files per test source (default: 1)")
+    argParser.add_argument("--seed", type=int, default=0, help="seed for the random generator (default: 0)")
+
+    args = argParser.parse_args()
+    implementation_details, raw_metrics = generate(
+        output_dir=args.output_dir,
+        services=args.services,
+        operations=args.operations,
+        rows=args.rows,
+        files_per_source=args.files_per_source,
+        seed=args.seed,
+    )
+    print(f"implementation-details: {implementation_details}")
+    print(f"raw metrics: {raw_metrics}")
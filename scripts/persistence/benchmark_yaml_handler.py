@@ -0,0 +1,63 @@
+"""
+Micro-benchmark for the per-file cost of loading and dumping the frontmatter of the service pages,
+comparing a fresh ruamel.yaml instance per call with the reused instances of CustomYAMLHandler.
+"""
+import argparse
+import glob
+import os
+import time
+
+from ruamel.yaml import YAML
+
+from create_persistence_docs import FRONTMATTER_PATTERN, markdown_path
+from yaml_handler import CustomYAMLHandler
+
+
+class FreshYAMLHandler(CustomYAMLHandler):
+    """Sets up a new ruamel.yaml instance for every call, like CustomYAMLHandler did before"""
+
+    @classmethod
+    def _yaml(cls) -> YAML:
+        yaml = YAML()
+        yaml.default_flow_style = False
+        yaml.preserve_quotes = True
+        return yaml
+
+
+def _measure(handler: CustomYAMLHandler, headers: list[str], rounds: int) -> tuple[float, list[str]]:
+    exported = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        exported = [handler.export(handler.load(header)) for header in headers]
+    return (time.perf_counter() - start) / (rounds * len(headers)), exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-file load/dump cost of the frontmatter handlers")
+    parser.add_argument("--pages", default=markdown_path, help=f"directory with the pages (default: {markdown_path})")
+    parser.add_argument("--rounds", type=int, default=5, help="how often all pages are processed (default: 5)")
+    args = parser.parse_args()
+
+    headers = []
+    for path in sorted(glob.glob(os.path.join(args.pages, "*.md*"))):
+        with open(path, "r") as f:
+            if match := FRONTMATTER_PATTERN.match(f.read()):
+                headers.append(match.group("metadata"))
+    if not headers:
+        print(f"No pages with frontmatter found in {args.pages}")
+        return 1
+
+    fresh, fresh_exported = _measure(FreshYAMLHandler(), headers, args.rounds)
+    reused, reused_exported = _measure(CustomYAMLHandler(), headers, args.rounds)
+    if fresh_exported != reused_exported:
+        print("❌ The handlers produced different output!")
+        return 1
+
+    print(f"{len(headers)} pages, {args.rounds} rounds (load + dump per page)")
+    print(f"fresh YAML instance:  {fresh * 1000:.3f} ms per page")
+    print(f"reused YAML instance: {reused * 1000:.3f} ms per page ({fresh / reused:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,12 +1,19 @@
 import os
+import re
+import sys
+import tempfile
 from io import BytesIO
 import json
 from pathlib import Path
 import notion_client as n_client
-import frontmatter
-from ruamel.yaml import YAML
-from frontmatter.default_handlers import YAMLHandler, DEFAULT_POST_TEMPLATE
-from notion.catalog import PersistenceCatalog
+from yaml_handler import CustomYAMLHandler
+from notion.catalog import CachedPersistenceCatalog, DEFAULT_CACHE_FILE
+from notion.fake import FakeNotionClient
+
+# the display names are resolved with the lookup shared with the other generators in "scripts"
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.content_index import ContentIndex  # noqa: E402
+from scripts.service_display_names import lookup_full_name  # noqa: E402
 
 token = os.getenv("NOTION_TOKEN")
 markdown_path = "../../src/content/docs/aws/services"
@@ -14,63 +21,15 @@ persistence_path = "../../src/data/persistence"
 persistence_data = os.path.join(persistence_path, "coverage.json")
 
 
-class CustomYAMLHandler(YAMLHandler):
-
-    def load(self, fm: str, **kwargs: object):
-        yaml = YAML()
-        yaml.default_flow_style = False
-        yaml.preserve_quotes = True
-        return yaml.load(fm, **kwargs)  # type: ignore[arg-type]
-
-    def export(self, metadata: dict[str, object], **kwargs: object) -> str:
-        yaml = YAML()
-        yaml.default_flow_style = False
-        from io import StringIO
-        stream = StringIO()
-        yaml.dump(metadata, stream)
-        return stream.getvalue().rstrip()
-
-    def format(self, post, **kwargs):
-        """
-        Simple customization to avoid removing the last line.
-        """
-        start_delimiter = kwargs.pop("start_delimiter", self.START_DELIMITER)
-        end_delimiter = kwargs.pop("end_delimiter", self.END_DELIMITER)
-
-        metadata = self.export(post.metadata, **kwargs)
-
-        return DEFAULT_POST_TEMPLATE.format(
-            metadata=metadata,
-            content=post.content,
-            start_delimiter=start_delimiter,
-            end_delimiter=end_delimiter,
-        ).lstrip()
-
-
-def lookup_full_name(shortname: str) -> str:
-    """Given the short default name of a service, looks up for the full name"""
-    service_lookup = Path("../../src/data/coverage/service_display_name.json")
-    service_info = {}
-    if service_lookup.exists() and service_lookup.is_file():
-        with open(service_lookup, "r") as f:
-            service_info = json.load(f)
-
-    service_name_title = shortname
-
-    if service_name_details := service_info.get(shortname, {}):
-        service_name_title = service_name_details.get("long_name", shortname)
-        if service_name_title and (short_name := service_name_details.get("short_name")):
-            service_name_title = f"{short_name} ({service_name_title})"
-    return service_name_title
-
-
-def collect_status() -> dict:
+def collect_status(notion_client=None, cache_file=DEFAULT_CACHE_FILE) -> dict:
     """Reads the catalog on Notion and returns the status of persistence for each service"""
-    if not token:
-        print("Aborting, please provide a NOTION_TOKEN in the env") 
-    notion_client = n_client.Client(auth=token)
+    if notion_client is None:
+        if not token:
+            print("Aborting, please provide a NOTION_TOKEN in the env") 
+        notion_client = n_client.Client(auth=token)
     
-    catalog_db = PersistenceCatalog(notion_client=notion_client)
+    # only the pages changed since the last run (cached in cache_file) are fetched
+    catalog_db = CachedPersistenceCatalog(notion_client=notion_client, cache_file=cache_file)
     statuses = {}
     for item in catalog_db:
         # skip services that are not implemented
@@ -109,34 +68,95 @@ def collect_status() -> dict:
     return statuses
 
     
-def update_frontmatter(statuses: dict):
-    """Updates the frontmatter of the service page in the user guide Markdown file"""
+# the YAML header block at the start of a Markdown file
+FRONTMATTER_PATTERN = re.compile(r"\A---[ \t]*\n(?P<metadata>.*?)\n?^---[ \t]*$", re.DOTALL | re.MULTILINE)
+
+
+def _write_atomically(path: str, content: str):
+    """Writes the file via a temporary file in the same directory, so the file is never partially written"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".mdx")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        # mkstemp creates the file with mode 0600, the page keeps its permissions
+        os.chmod(tmp_path, os.stat(path).st_mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def update_frontmatter(statuses: dict) -> list[str]:
+    """
+    Updates the frontmatter of the service page in the user guide Markdown file.
+    The shared content index tells which pages exist and already have the values, only the other pages are read
+    and only pages with changed values are written.
+    Returns the paths of the updated pages.
+    """
+    # collect the desired persistence value per page first
+    desired_values = {}
     for service, values in statuses.items():
-
-        # a bunch of special cases
-        if "cognito" in service:
-            service = "cognito"
-        if service == "kafka":
-            service = "msk"
-        
-        _path = os.path.join(markdown_path, f"{service}.mdx")
-        if not os.path.exists(_path):
-            continue
-
         support_value = values.get("support")
         is_supported = support_value == "supported" or support_value == "supported with limitations"
         if not is_supported:
             # we don't want to modify the frontmatter for the services not supporting persistence
             continue
+        desired_values[service] = values.get("support", "unknown")
+
+    content_dir = Path(markdown_path).parents[1]
+    pages_dir = Path(markdown_path).relative_to(content_dir).as_posix()
+    content_index = ContentIndex(content_dir)
+    content_index.refresh()
+
+    handler = CustomYAMLHandler()
+    updated = []
+    for page, persistence in desired_values.items():
+        entry = content_index.get(f"{pages_dir}/{page}.mdx")
+        if entry is None:
+            continue
+        description = entry.frontmatter.get("description")
+        if entry.frontmatter.get("persistence") == persistence and \
+                isinstance(description, str) and description == description.strip():
+            # the page already has the values, no need to read it
+            continue
+
+        _path = os.path.join(markdown_path, f"{page}.mdx")
+        with open(_path, "r") as f:
+            text = f.read()
+        if not (match := FRONTMATTER_PATTERN.match(text)):
+            print(f"WARN: no frontmatter found in {_path}")
+            continue
+
+        metadata = handler.load(match.group("metadata"))
+        changes = {
+            "description": metadata["description"].strip(),
+            "persistence": persistence,
+        }
+        if all(key in metadata and metadata[key] == value for key, value in changes.items()):
+            continue
+
+        metadata.update(changes)
+        # the rest of the page is kept as it is
+        _write_atomically(_path, f"---\n{handler.export(metadata)}\n---{text[match.end():]}")
+        updated.append(_path)
 
-        # open the markdown file and read the content
-        content = frontmatter.load(_path, handler=CustomYAMLHandler())
-        desc = content.metadata["description"]
-        content.metadata["description"] = desc.strip()
-        content.metadata["persistence"] = values.get("support", "unknown")
-        frontmatter.dump(content, _path)
+    print(f"Updated the frontmatter of {len(updated)} of {len(desired_values)} service pages")
+    for _path in updated:
+        print(f"  {_path}")
+    return updated
 
 
 if __name__ == "__main__":
-    data = collect_status()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update the persistence coverage docs from the Notion catalog")
+    parser.add_argument("--cache-file", default=str(DEFAULT_CACHE_FILE),
+                        help=f"local cache of the fetched catalog pages (default: {DEFAULT_CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="fetch the entire catalog without a local cache")
+    parser.add_argument("--snapshot",
+                        help="run offline against a recorded catalog snapshot (e.g. a cache file) instead of Notion")
+    args = parser.parse_args()
+
+    client = FakeNotionClient(args.snapshot) if args.snapshot else None
+    data = collect_status(notion_client=client, cache_file=None if args.no_cache else args.cache_file)
     update_frontmatter(statuses=data)
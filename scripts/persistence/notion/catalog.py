@@ -1,6 +1,11 @@
 """Models for the notion service catalog https://www.notion.so/localstack/3c0f615e7ffc4ae2a034f1ed9c444bd2"""
 
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
 from notion_client import Client as NotionClient
+from notion_client.helpers import iterate_paginated_api
 
 from notion_objects import (
     Page,
@@ -29,3 +34,89 @@ class PersistenceServiceItem(Page):
 class PersistenceCatalog(Database[PersistenceServiceItem]):
     def __init__(self, notion_client: NotionClient, database_id: str | None = None):
         super().__init__(PersistenceServiceItem, database_id or DEFAULT_CATALOG_DATABASE_ID, notion_client)
+
+
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parents[1].joinpath(".cache", "persistence_catalog.json")
+
+
+class CachedPersistenceCatalog(PersistenceCatalog):
+    """
+    PersistenceCatalog that keeps the fetched pages in a local cache file. When iterated, the database is queried
+    only for the pages that were added or changed since the last run (filtered on ``last_edited_time``), plus a
+    lightweight listing of the page ids to drop removed pages. Without a cache, the whole database is queried once.
+    """
+
+    def __init__(
+        self,
+        notion_client: NotionClient,
+        database_id: str | None = None,
+        cache_file: str | Path | None = DEFAULT_CACHE_FILE,
+    ):
+        super().__init__(notion_client, database_id)
+        self.cache_file = Path(cache_file) if cache_file else None
+
+    def __iter__(self):
+        for page in self.fetch():
+            yield self.type(page)
+
+    def _query(self, **kwargs) -> list[dict]:
+        return list(
+            iterate_paginated_api(
+                self.client.databases.query,
+                database_id=self.database_id,
+                page_size=self.default_page_size,
+                **kwargs,
+            )
+        )
+
+    def fetch(self) -> list[dict]:
+        """
+        Synchronizes the cache with the database and returns the raw page objects, in the order of the database.
+        """
+        cache = self._load_cache()
+        cached_pages = cache["pages"]
+        synced_at = cache.get("synced_at")
+        started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+        if not synced_at:
+            # the query returns the full pages, 100 per request
+            pages = {page["id"]: page for page in self._query()}
+        else:
+            # last_edited_time only has a precision of minutes, pages edited in the minute of the last sync are refetched
+            changed_pages = {
+                page["id"]: page
+                for page in self._query(
+                    filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": synced_at}}
+                )
+            }
+            # the title is the only property every database has (with the fixed id "title")
+            listing = self._query(filter_properties=["title"])
+            for item in listing:
+                if item["id"] not in changed_pages and item["id"] not in cached_pages:
+                    # only happens if the cache is incomplete, e.g. it was edited by hand
+                    changed_pages[item["id"]] = self.client.pages.retrieve(item["id"])
+            # pages which are not listed anymore were removed from the database
+            pages = {item["id"]: changed_pages.get(item["id"]) or cached_pages[item["id"]] for item in listing}
+
+        self._save_cache({"database_id": self.database_id, "synced_at": started_at, "pages": pages})
+        return list(pages.values())
+
+    def _load_cache(self) -> dict:
+        if self.cache_file and self.cache_file.is_file():
+            try:
+                with open(self.cache_file, "r") as f:
+                    cache = json.load(f)
+                if cache.get("database_id") == self.database_id:
+                    return cache
+            except json.JSONDecodeError:
+                pass
+        return {"pages": {}}
+
+    def _save_cache(self, cache: dict):
+        if not self.cache_file:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(cache, f)
+        tmp_file.replace(self.cache_file)
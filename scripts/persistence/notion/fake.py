@@ -0,0 +1,75 @@
+"""Offline stand-in for the Notion client, serving a recorded snapshot of a database"""
+
+import copy
+import json
+from pathlib import Path
+
+
+class _FakeDatabasesEndpoint:
+    def __init__(self, client: "FakeNotionClient"):
+        self.client = client
+
+    def query(self, database_id: str, **kwargs) -> dict:
+        self.client.requests += 1
+        pages = self.client.pages_of(database_id)
+        if edited_filter := (kwargs.get("filter") or {}).get("last_edited_time"):
+            # the only filter used by the catalogs, the timestamps are ISO 8601 strings in UTC
+            pages = [page for page in pages if page["last_edited_time"] >= edited_filter["on_or_after"]]
+        start = int(kwargs.get("start_cursor") or 0)
+        page_size = kwargs.get("page_size") or 100
+        results = [self.client.project(page, kwargs.get("filter_properties")) for page in pages[start : start + page_size]]
+        has_more = start + page_size < len(pages)
+        return {
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": str(start + page_size) if has_more else None,
+        }
+
+    def retrieve(self, database_id: str, **kwargs) -> dict:
+        return {"object": "database", "id": database_id, "title": [], "properties": {}, "url": ""}
+
+
+class _FakePagesEndpoint:
+    def __init__(self, client: "FakeNotionClient"):
+        self.client = client
+
+    def retrieve(self, page_id: str, **kwargs) -> dict:
+        self.client.requests += 1
+        return self.client.project(self.client.snapshot[page_id], kwargs.get("filter_properties"))
+
+
+class FakeNotionClient:
+    """
+    Implements the parts of the notion_client.Client used by the catalogs (paginated database queries, filtered on
+    last_edited_time, and page retrieval) on top of a snapshot file, so the persistence pipeline can be run and benchmarked offline.
+    The snapshot is either a list of page objects, or a catalog cache file written by CachedPersistenceCatalog.
+    """
+
+    def __init__(self, snapshot_file: str | Path):
+        with open(snapshot_file, "r") as f:
+            snapshot = json.load(f)
+        pages = snapshot["pages"].values() if isinstance(snapshot, dict) else snapshot
+        self.snapshot = {page["id"]: page for page in pages}
+        # counts the API requests (queries and page retrievals), e.g. to check the requests of a cached run
+        self.requests = 0
+        self.databases = _FakeDatabasesEndpoint(self)
+        self.pages = _FakePagesEndpoint(self)
+
+    def pages_of(self, database_id: str) -> list[dict]:
+        return [
+            page
+            for page in self.snapshot.values()
+            if page.get("parent", {}).get("database_id", database_id).replace("-", "") == database_id.replace("-", "")
+        ]
+
+    @staticmethod
+    def project(page: dict, filter_properties: list[str] | None) -> dict:
+        page = copy.deepcopy(page)
+        if filter_properties is not None:
+            page["properties"] = {
+                name: value
+                for name, value in page["properties"].items()
+                if value.get("id") in filter_properties or name in filter_properties
+            }
+        return page
@@ -0,0 +1,58 @@
+import threading
+from io import StringIO
+
+from ruamel.yaml import YAML
+from frontmatter.default_handlers import YAMLHandler, DEFAULT_POST_TEMPLATE
+
+
+class CustomYAMLHandler(YAMLHandler):
+    """
+    Round-trip YAML handler for the frontmatter, which keeps quotes, comments and the order of the keys.
+    """
+
+    # setting up a ruamel.yaml instance is expensive, but the instances are not thread-safe:
+    # every thread reuses its own preconfigured instance (and output stream) for all files
+    _local = threading.local()
+
+    @classmethod
+    def _yaml(cls) -> YAML:
+        yaml = getattr(cls._local, "yaml", None)
+        if yaml is None:
+            yaml = YAML()
+            yaml.default_flow_style = False
+            yaml.preserve_quotes = True
+            cls._local.yaml = yaml
+        return yaml
+
+    @classmethod
+    def _stream(cls) -> StringIO:
+        stream = getattr(cls._local, "stream", None)
+        if stream is None:
+            stream = cls._local.stream = StringIO()
+        stream.seek(0)
+        stream.truncate()
+        return stream
+
+    def load(self, fm: str, **kwargs: object):
+        return self._yaml().load(fm, **kwargs)  # type: ignore[arg-type]
+
+    def export(self, metadata: dict[str, object], **kwargs: object) -> str:
+        stream = self._stream()
+        self._yaml().dump(metadata, stream)
+        return stream.getvalue().rstrip()
+
+    def format(self, post, **kwargs):
+        """
+        Simple customization to avoid removing the last line.
+        """
+        start_delimiter = kwargs.pop("start_delimiter", self.START_DELIMITER)
+        end_delimiter = kwargs.pop("end_delimiter", self.END_DELIMITER)
+
+        metadata = self.export(post.metadata, **kwargs)
+
+        return DEFAULT_POST_TEMPLATE.format(
+            metadata=metadata,
+            content=post.content,
+            start_delimiter=start_delimiter,
+            end_delimiter=end_delimiter,
+        ).lstrip()
@@ -9,6 +9,10 @@ import argparse
 from urllib.parse import urlparse
 from pathlib import Path
 
+from link_targets import DEFAULT_CONTENT_DIR, LinkTargetIndex, find_missing_targets
+from redirect_compaction import compact_rules
+from redirect_resolver import parse_redirects
+
 
 def normalize_destination(destination):
     """
@@ -35,8 +39,15 @@ def normalize_path(path):
     return path
 
 
-def generate_redirects_file(config_file, output_file):
-    """Generate CloudFlare _redirects file from JSON config."""
+def generate_redirects_file(config_file, output_file, link_index=None, compact=True, merge_siblings=False,
+                            strict_link_check=False):
+    """
+    Generate CloudFlare _redirects file from JSON config.
+    If a link target index is given, all internal destinations are checked against it before anything is written,
+    missing destinations are reported (or raise a ValueError with strict_link_check).
+    With compact, redirect chains are flattened to their final target and duplicate rules are dropped,
+    merge_siblings additionally drops groups of sibling rules which are covered by a placeholder rule.
+    """
     
     # Load configuration
     with open(config_file, 'r') as f:
@@ -74,6 +85,29 @@ def generate_redirects_file(config_file, output_file):
             
     #         redirects.append(f"{old_path} {new_destination} {status_code}")
     
+    if link_index is not None:
+        sources = {redirect.split()[0] for redirect in redirects}
+        # destinations which are redirected themselves are resolved by the following rule
+        missing = [
+            destination for destination in find_missing_targets((redirect.split()[1] for redirect in redirects), link_index)
+            if destination not in sources
+        ]
+        if missing:
+            details = "\n".join(f"   {destination}" for destination in sorted(set(missing)))
+            message = f"{len(missing)} redirects point to pages which do not exist:\n{details}"
+            if strict_link_check:
+                raise ValueError(message)
+            print(f"⚠️  {message}")
+
+    if compact:
+        # pages must keep being served, with and without trailing slash
+        known_paths = []
+        if link_index is not None:
+            known_paths = [variant for target in link_index.targets for variant in (target, target.rstrip('/') + '/')]
+        rules, stats = compact_rules(parse_redirects(redirects), known_paths, merge_siblings=merge_siblings)
+        redirects = [str(rule) for rule in rules]
+        print(stats.summary())
+
     # Write to output file
     with open(output_file, 'w') as f:
         for redirect in redirects:
@@ -92,6 +126,16 @@ def main():
                        help='Path to JSON config file (default: redirects_config.json)')
     parser.add_argument('--output', default='_redirects',
                        help='Output file path (default: _redirects)')
+    parser.add_argument('--content-dir', default=DEFAULT_CONTENT_DIR,
+                       help='Docs content directory used to validate destinations (default: src/content/docs)')
+    parser.add_argument('--skip-link-check', action='store_true',
+                       help='Do not check that internal destinations exist')
+    parser.add_argument('--strict-link-check', action='store_true',
+                       help='Fail instead of warning if internal destinations do not exist')
+    parser.add_argument('--no-compact', action='store_true',
+                       help='Write the rules as configured, without flattening chains or dropping duplicates')
+    parser.add_argument('--merge-siblings', action='store_true',
+                       help='Merge groups of sibling redirects into the placeholder rules covering them')
     
     args = parser.parse_args()
     
@@ -101,7 +145,10 @@ def main():
         return 1
     
     try:
-        generate_redirects_file(config_path, args.output)
+        link_index = None if args.skip_link_check else LinkTargetIndex(args.content_dir).build()
+        generate_redirects_file(config_path, args.output, link_index,
+                                compact=not args.no_compact, merge_siblings=args.merge_siblings,
+                                strict_link_check=args.strict_link_check)
         print(f"\n✅ Successfully generated {args.output}")
         print(f"📋 You can now upload this file to your CloudFlare Pages project")
         
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Index of every routable page of the docs, used to validate redirect destinations before deployment.
+Pages are taken from the shared content index of src/content/docs (see scripts/content_index.py), which derives
+their slugs like Starlight and is only refreshed for changed files. Static files in public/ are routable as-is.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from urllib.parse import urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+# the content index is shared with the other docs tooling in "scripts"
+sys.path.append(str(REPO_ROOT))
+from scripts.content_index import DEFAULT_CONTENT_DIR, ContentIndex  # noqa: E402
+
+DEFAULT_PUBLIC_DIR = REPO_ROOT / 'public'
+# files in public/ which configure CloudFlare Pages instead of being served
+PUBLIC_CONFIG_FILES = {'_redirects', '_headers', '_routes.json'}
+
+
+def _scan(directory: Path):
+    """Yield (relative path, stat result) for all files below the directory."""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield Path(entry.path).relative_to(directory).as_posix(), entry.stat()
+
+
+class LinkTargetIndex:
+    """Set of all routable paths (without trailing slash) of the docs."""
+
+    def __init__(self, content_dir=DEFAULT_CONTENT_DIR, public_dir=DEFAULT_PUBLIC_DIR, cache_file=None):
+        self.content_index = ContentIndex(content_dir, cache_file)
+        self.public_dir = Path(public_dir) if public_dir else None
+        self.targets = set()
+        # number of content files (re-)read during the last build
+        self.parsed_files = 0
+
+    def build(self) -> 'LinkTargetIndex':
+        """(Re-)build the index, only content files changed since the last build are read."""
+        self.parsed_files = len(self.content_index.refresh())
+        self.targets = {'/' + entry.slug if entry.slug else '/' for entry in self.content_index}
+        if self.public_dir and self.public_dir.exists():
+            self.targets.update(
+                '/' + relative_path for relative_path, _ in _scan(self.public_dir)
+                if relative_path not in PUBLIC_CONFIG_FILES
+            )
+        return self
+
+    def __contains__(self, destination: str) -> bool:
+        """Check if an internal destination (with or without trailing slash, anchor or query) exists."""
+        path = urlsplit(destination).path or '/'
+        if path != '/':
+            path = path.rstrip('/')
+        return path in self.targets
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+
+def find_missing_targets(destinations, index: LinkTargetIndex) -> list:
+    """Return the internal destinations which are not routable."""
+    return [
+        destination for destination in destinations
+        if not urlsplit(destination).scheme and ':' not in destination and destination not in index
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the index of routable docs pages')
+    parser.add_argument('--content-dir', default=DEFAULT_CONTENT_DIR,
+                       help='Docs content directory (default: src/content/docs)')
+    parser.add_argument('--cache-file',
+                       help='Cache file of the content index (default: scripts/.cache/content_index-<hash>.json)')
+    parser.add_argument('--check', nargs='*', default=[], metavar='PATH',
+                       help='Paths to look up in the index')
+
+    args = parser.parse_args()
+
+    index = LinkTargetIndex(args.content_dir, cache_file=args.cache_file).build()
+    print(f"📚 Indexed {len(index)} routable paths ({index.parsed_files} content files read)")
+
+    missing = find_missing_targets(args.check, index)
+    for path in args.check:
+        print(f"{'❌' if path in missing else '✅'} {path}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the CloudFlare Pages staging environment.
+Serves the rules of a generated _redirects file, so redirect tests can run without network access.
+"""
+
+import argparse
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from redirect_resolver import RedirectResolver, load_redirects
+
+
+class RedirectRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers requests with the matching redirect rule (matched like CloudFlare Pages, including placeholders
+    and splats), every other path is served as an existing page.
+    """
+
+    resolver = RedirectResolver([])
+
+    def _respond(self, include_body: bool):
+        path = urlsplit(self.path).path
+        redirect = self.resolver.redirect(path)
+        if redirect:
+            rule, destination = redirect
+            self.send_response(rule.status_code)
+            self.send_header('Location', destination)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = f"<html><body>{path}</body></html>".encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(include_body=True)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def log_message(self, format, *args):
+        # keep the test output readable
+        pass
+
+
+def create_server(redirects_file, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Create a server for the rules of the redirects file (port 0 picks a free port)."""
+    resolver = RedirectResolver(load_redirects(redirects_file))
+    handler = type('RulesRequestHandler', (RedirectRequestHandler,), {'resolver': resolver})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+@contextmanager
+def serve_redirects(redirects_file, host: str = '127.0.0.1', port: int = 0):
+    """Serve the redirects file in a background thread, yields the base URL of the server."""
+    server = create_server(redirects_file, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a _redirects file locally for testing')
+    parser.add_argument('--redirects', default='_redirects',
+                       help='Path to the _redirects file (default: _redirects)')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind to (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8787, help='Port to listen on (default: 8787)')
+
+    args = parser.parse_args()
+
+    if not Path(args.redirects).exists():
+        print(f"❌ Error: Redirects file '{args.redirects}' not found!")
+        return 1
+
+    server = create_server(args.redirects, args.host, args.port)
+    print(f"🚀 Serving {len(server.RequestHandlerClass.resolver.rules)} redirects on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
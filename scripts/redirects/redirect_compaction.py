@@ -0,0 +1,141 @@
+"""
+Optimization pass for _redirects rules.
+Flattens redirect chains to their final target, drops rules which can never match, and optionally merges
+groups of sibling rules into the placeholder rule covering them where that provably does not change the resolution of any path.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field, replace
+
+from redirect_resolver import RedirectResolver, RedirectRule
+
+PLACEHOLDER = ':slug'
+DEFAULT_MIN_GROUP_SIZE = 3
+
+
+@dataclass
+class CompactionStats:
+    rules_before: int = 0
+    rules_after: int = 0
+    duplicates: int = 0
+    flattened: int = 0
+    merged: int = 0
+    # number of hops before the final target was reached -> number of rules
+    hops_before: Counter = field(default_factory=Counter)
+    hops_after: Counter = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        def histogram(hops):
+            return ", ".join(f"{count}: {rules}" for count, rules in sorted(hops.items()))
+        return "\n".join([
+            f"Rules: {self.rules_before} -> {self.rules_after} "
+            f"({self.duplicates} duplicates dropped, {self.flattened} chains flattened, "
+            f"{self.merged} rules merged into placeholder rules)",
+            f"Hops per rule before: {histogram(self.hops_before)}",
+            f"Hops per rule after:  {histogram(self.hops_after)}",
+        ])
+
+
+def _hop_histogram(resolver: RedirectResolver, sources) -> Counter:
+    return Counter(len(resolver.resolve(source).hops) for source in sources)
+
+
+def _sibling_key(rule: RedirectRule):
+    """
+    Return the placeholder rule a static rule would be part of, e.g. "/user-guide/aws/s3/ -> /aws/services/s3"
+    belongs to "/user-guide/aws/:slug/ -> /aws/services/:slug" (or None if its leaf is not used in the destination).
+    """
+    segments = rule.source.split('/')
+    leaf_index = len(segments) - 2 if segments[-1] == '' else len(segments) - 1
+    leaf = segments[leaf_index]
+    if not leaf or leaf.startswith(':') or leaf == '*':
+        return None
+    destination_segments = rule.destination.split('/')
+    if destination_segments.count(leaf) != 1:
+        return None
+    segments[leaf_index] = PLACEHOLDER
+    destination_segments[destination_segments.index(leaf)] = PLACEHOLDER
+    return '/'.join(segments), '/'.join(destination_segments), rule.status_code
+
+
+def _merge_siblings(rules, known_paths, min_group_size: int):
+    """
+    Merge groups of sibling rules into the placeholder or splat rules which already cover them.
+    A new placeholder rule would also redirect every other path under the prefix (e.g. a missing page would no longer
+    404), so only existing dynamic rules are used: a sibling is dropped if its source still resolves the same way
+    without it. Dropping a static rule only changes the paths which pass through its source, so the result is
+    equivalent for every path (the known paths are checked once more to be sure).
+    """
+    groups = defaultdict(list)
+    for rule in rules:
+        if not rule.is_dynamic:
+            key = _sibling_key(rule)
+            if key is not None:
+                groups[key].append(rule)
+
+    original = RedirectResolver(rules)
+    merged_rules = list(rules)
+    for members in groups.values():
+        if len(members) < min_group_size:
+            continue
+        without_members = RedirectResolver([rule for rule in merged_rules if rule not in members])
+        covered = [
+            rule for rule in members
+            if without_members.resolve(rule.source).final_destination == original.resolve(rule.source).final_destination
+        ]
+        if len(covered) < min_group_size:
+            continue
+        candidate_rules = [rule for rule in merged_rules if rule not in covered]
+        candidate = RedirectResolver(candidate_rules)
+        if all(
+            candidate.resolve(path).final_destination == original.resolve(path).final_destination
+            for path in known_paths
+        ):
+            merged_rules = candidate_rules
+    return merged_rules
+
+
+def compact_rules(rules, known_paths=(), merge_siblings: bool = False,
+                  min_group_size: int = DEFAULT_MIN_GROUP_SIZE):
+    """
+    Compact the rules without changing where any redirect ends up.
+
+    :param rules: rules in file order
+    :param known_paths: additional paths which must not change their behavior (e.g. all pages of the docs),
+                        used to verify sibling merges
+    :param merge_siblings: merge groups of sibling rules into the placeholder or splat rules covering them
+    :param min_group_size: minimum number of sibling rules to merge into a placeholder rule
+    :return: tuple of the compacted rules and the CompactionStats
+    """
+    rules = list(rules)
+    resolver = RedirectResolver(rules)
+    stats = CompactionStats(rules_before=len(rules))
+    stats.hops_before = _hop_histogram(resolver, [rule.source for rule in rules if not rule.is_dynamic])
+
+    compacted = []
+    seen_sources = set()
+    for rule in rules:
+        if rule.source in seen_sources:
+            # the first rule for a source wins, later ones can never match
+            stats.duplicates += 1
+            continue
+        seen_sources.add(rule.source)
+        if not rule.is_dynamic:
+            resolution = resolver.resolve(rule.source)
+            if resolution.loop or resolution.too_many_hops:
+                chain = ' -> '.join([rule.source] + [destination for _, destination in resolution.hops])
+                raise ValueError(f"Redirect loop: {chain}")
+            if len(resolution.hops) > 1:
+                rule = replace(rule, destination=resolution.final_destination)
+                stats.flattened += 1
+        compacted.append(rule)
+
+    if merge_siblings:
+        known = {rule.source for rule in rules if not rule.is_dynamic} | set(known_paths)
+        merged = _merge_siblings(compacted, sorted(known), min_group_size)
+        stats.merged = len(compacted) - len(merged)
+        compacted = merged
+
+    stats.rules_after = len(compacted)
+    stats.hops_after = _hop_histogram(RedirectResolver(compacted), [rule.source for rule in rules if not rule.is_dynamic])
+    return compacted, stats
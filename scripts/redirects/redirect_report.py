@@ -0,0 +1,164 @@
+"""
+Streaming report writers for redirect test results.
+Each writer gets the test details one by one (add) and finishes the report with the totals (close),
+so reports are written incrementally with constant memory, in a single pass over the results.
+"""
+
+import json
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from xml.sax.saxutils import escape, quoteattr
+
+
+class ReportWriter(ABC):
+    """Base class of the report writers."""
+
+    def __init__(self, output_file, staging_url: str):
+        self.output_file = output_file
+        self.staging_url = staging_url
+        self.total = 0
+        self.failed = 0
+
+    def add(self, detail: dict):
+        self.total += 1
+        if not detail['success']:
+            self.failed += 1
+        self._add(detail)
+
+    @abstractmethod
+    def _add(self, detail: dict):
+        """Writes (or spools) a single test detail."""
+
+    @abstractmethod
+    def close(self):
+        """Finishes the report with the totals."""
+
+
+class MarkdownReportWriter(ReportWriter):
+    """
+    Markdown report with a summary, the failed tests and all test details.
+    The summary and the failures come first in the report, so both sections are spooled to temporary files
+    until the totals are known.
+    """
+
+    def __init__(self, output_file, staging_url: str):
+        super().__init__(output_file, staging_url)
+        self._failures = tempfile.TemporaryFile()
+        self._details = tempfile.TemporaryFile()
+
+    @staticmethod
+    def _write_lines(f, lines):
+        f.write("".join(f"{line}\n" for line in lines).encode())
+
+    def _add(self, detail: dict):
+        if not detail['success']:
+            self._write_lines(self._failures, [
+                f"### {detail['product'].upper()}: {detail['old_url']}",
+                f"- **Expected:** {detail['expected_new_url']}",
+                f"- **Got:** {detail['final_url']}",
+                f"- **Status:** {detail['status_code']}",
+                f"- **Message:** {detail['message']}",
+                "",
+            ])
+        status_icon = "✅" if detail['success'] else "❌"
+        self._write_lines(self._details, [
+            f"### {status_icon} {detail['product'].upper()}: {detail['old_url']}",
+            f"- **Expected:** {detail['expected_new_url']}",
+            f"- **Final URL:** {detail['final_url']}",
+            f"- **Status Code:** {detail['status_code']}",
+            f"- **Message:** {detail['message']}",
+            "",
+        ])
+
+    def close(self):
+        passed = self.total - self.failed
+        with open(self.output_file, 'wb') as f:
+            self._write_lines(f, [
+                "# LocalStack Redirect Test Report",
+                f"**Generated:** {time.strftime('%Y-%m-%d %H:%M:%S')}",
+                f"**Staging URL:** {self.staging_url}",
+                "",
+                "## Summary",
+                f"- **Total tests:** {self.total}",
+                f"- **Passed:** {passed} ✅",
+                f"- **Failed:** {self.failed} ❌",
+                f"- **Success rate:** {(passed / self.total * 100):.1f}%" if self.total > 0 else "- **Success rate:** N/A",
+                "",
+            ])
+            if self.failed > 0:
+                self._write_lines(f, ["## Failed Tests"])
+                self._failures.seek(0)
+                shutil.copyfileobj(self._failures, f)
+            self._write_lines(f, ["## All Test Details"])
+            self._details.seek(0)
+            shutil.copyfileobj(self._details, f)
+            # the lines are separated by newlines, without a newline at the end of the report
+            f.truncate(f.tell() - 1)
+        self._failures.close()
+        self._details.close()
+
+
+class JsonlReportWriter(ReportWriter):
+    """One JSON object per test, written as soon as the test is added."""
+
+    def __init__(self, output_file, staging_url: str):
+        super().__init__(output_file, staging_url)
+        self._file = open(output_file, 'w')
+
+    def _add(self, detail: dict):
+        self._file.write(json.dumps(dict(detail, staging_url=self.staging_url)) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class JUnitReportWriter(ReportWriter):
+    """
+    JUnit XML report, so CI systems can show the redirect tests natively.
+    The test suite element carries the totals, so the test cases are spooled until the totals are known.
+    """
+
+    def __init__(self, output_file, staging_url: str):
+        super().__init__(output_file, staging_url)
+        self._testcases = tempfile.TemporaryFile()
+
+    def _add(self, detail: dict):
+        testcase = f'    <testcase classname={quoteattr("redirects." + detail["product"])} name={quoteattr(detail["old_url"])}'
+        if detail['success']:
+            testcase += ' />\n'
+        else:
+            text = (f"Expected: {detail['expected_new_url']}\nGot: {detail['final_url']}\n"
+                    f"Status: {detail['status_code']}")
+            testcase += (f'>\n      <failure message={quoteattr(detail["message"])}>{escape(text)}</failure>\n'
+                         f'    </testcase>\n')
+        self._testcases.write(testcase.encode())
+
+    def close(self):
+        with open(self.output_file, 'wb') as f:
+            f.write(
+                f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<testsuites tests="{self.total}" failures="{self.failed}">\n'
+                f'  <testsuite name={quoteattr("redirects " + self.staging_url)} tests="{self.total}" '
+                f'failures="{self.failed}" errors="0" timestamp="{time.strftime("%Y-%m-%dT%H:%M:%S")}">\n'.encode()
+            )
+            self._testcases.seek(0)
+            shutil.copyfileobj(self._testcases, f)
+            f.write(b'  </testsuite>\n</testsuites>\n')
+        self._testcases.close()
+
+
+class MultiReportWriter:
+    """Feeds every test detail to several report writers, so all formats are written in one pass."""
+
+    def __init__(self, writers):
+        self.writers = list(writers)
+
+    def add(self, detail: dict):
+        for writer in self.writers:
+            writer.add(detail)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Offline resolver for CloudFlare Pages _redirects files.
+Evaluates the rules in-process (without any HTTP request) to find redirect loops, multi-hop chains
+and shadowed rules, and checks the redirects of the JSON config against the rules.
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DEFAULT_STATUS_CODE = 302
+DEFAULT_MAX_HOPS = 10
+
+
+@dataclass(frozen=True)
+class RedirectRule:
+    """A single line of a _redirects file."""
+    source: str
+    destination: str
+    status_code: int
+    line_number: int
+
+    def __str__(self):
+        return f"{self.source} {self.destination} {self.status_code}"
+
+    @property
+    def segments(self):
+        return _split_segments(self.source)
+
+    @property
+    def is_dynamic(self) -> bool:
+        """Dynamic rules contain a splat (*) or placeholders (:name), static rules match exactly."""
+        return any(segment == '*' or segment.startswith(':') for segment in self.segments)
+
+
+@dataclass
+class Resolution:
+    """The result of following the rules for a single path."""
+    path: str
+    hops: list = field(default_factory=list)
+    loop: bool = False
+    too_many_hops: bool = False
+
+    @property
+    def final_destination(self) -> str:
+        return self.hops[-1][1] if self.hops else self.path
+
+    @property
+    def matched(self) -> bool:
+        return bool(self.hops)
+
+
+def _split_segments(path: str) -> list:
+    # "/a/b/" -> ["a", "b", ""], the trailing empty segment keeps the trailing slash significant
+    return path.split('/')[1:]
+
+
+def _is_internal(destination: str) -> bool:
+    return not urlsplit(destination).scheme
+
+
+def parse_redirects(lines) -> list:
+    """Parse the lines of a _redirects file into rules (in file order)."""
+    rules = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split()
+        if len(parts) < 2:
+            raise ValueError(f"Invalid redirect on line {line_number}: '{line}'")
+        status_code = int(parts[2]) if len(parts) > 2 else DEFAULT_STATUS_CODE
+        rules.append(RedirectRule(parts[0], parts[1], status_code, line_number))
+    return rules
+
+
+def load_redirects(redirects_file) -> list:
+    """Parse a _redirects file into rules."""
+    with open(redirects_file, 'r') as f:
+        return parse_redirects(f)
+
+
+class _TrieNode:
+    __slots__ = ('children', 'placeholder', 'splat_rules', 'rules')
+
+    def __init__(self):
+        self.children = {}
+        self.placeholder = None
+        # rules ending at this node, and rules with a splat following this node
+        self.rules = []
+        self.splat_rules = []
+
+
+class RedirectResolver:
+    """
+    Evaluates _redirects rules like CloudFlare Pages: the first matching rule (in file order) wins.
+    Static rules are looked up in a dict, dynamic rules in a trie over the path segments, so resolving
+    a path does not depend on the number of rules.
+    """
+
+    def __init__(self, rules, max_hops: int = DEFAULT_MAX_HOPS):
+        self.rules = list(rules)
+        self.max_hops = max_hops
+        self._static = {}
+        self._trie = _TrieNode()
+        for rule in self.rules:
+            if rule.is_dynamic:
+                self._insert(rule)
+            else:
+                # later duplicates never match, they are reported by find_shadowed_rules
+                self._static.setdefault(rule.source, rule)
+
+    def _insert(self, rule: RedirectRule):
+        node = self._trie
+        segments = rule.segments
+        for index, segment in enumerate(segments):
+            if segment == '*':
+                if index != len(segments) - 1:
+                    raise ValueError(f"Splat must be the last segment on line {rule.line_number}: '{rule.source}'")
+                node.splat_rules.append(rule)
+                return
+            if segment.startswith(':'):
+                if node.placeholder is None:
+                    node.placeholder = _TrieNode()
+                node = node.placeholder
+            else:
+                node = node.children.setdefault(segment, _TrieNode())
+        node.rules.append(rule)
+
+    def _dynamic_candidates(self, segments: list) -> list:
+        candidates = []
+        stack = [(self._trie, 0)]
+        while stack:
+            node, index = stack.pop()
+            if node.splat_rules and index < len(segments):
+                candidates.extend(node.splat_rules)
+            if index == len(segments):
+                candidates.extend(node.rules)
+                continue
+            child = node.children.get(segments[index])
+            if child is not None:
+                stack.append((child, index + 1))
+            if node.placeholder is not None and segments[index]:
+                stack.append((node.placeholder, index + 1))
+        return candidates
+
+    def match(self, path: str):
+        """Return the first rule matching the path (or None)."""
+        best = self._static.get(path)
+        for rule in self._dynamic_candidates(_split_segments(path)):
+            if best is None or rule.line_number < best.line_number:
+                best = rule
+        return best
+
+    def _expand(self, rule: RedirectRule, path: str) -> str:
+        if not rule.is_dynamic:
+            return rule.destination
+        values = {}
+        segments = _split_segments(path)
+        for index, segment in enumerate(rule.segments):
+            if segment == '*':
+                values[':splat'] = '/'.join(segments[index:])
+                break
+            if segment.startswith(':'):
+                values[segment] = segments[index]
+        destination = rule.destination
+        # replace the longest placeholder names first, so ":id" does not clobber ":identifier"
+        for name in sorted(values, key=len, reverse=True):
+            destination = destination.replace(name, values[name])
+        return destination
+
+    def redirect(self, path: str):
+        """Return the first rule matching the path and the destination it redirects to (or None)."""
+        rule = self.match(path)
+        if rule is None:
+            return None
+        return rule, self._expand(rule, path)
+
+    def resolve(self, path: str) -> Resolution:
+        """Follow the rules from the path until an external or unmatched destination is reached."""
+        resolution = Resolution(path)
+        current = path
+        visited = {path}
+        while True:
+            redirect = self.redirect(current)
+            if redirect is None:
+                return resolution
+            rule, destination = redirect
+            resolution.hops.append((rule, destination))
+            if not _is_internal(destination):
+                return resolution
+            if destination in visited:
+                resolution.loop = True
+                return resolution
+            if len(resolution.hops) >= self.max_hops:
+                resolution.too_many_hops = True
+                return resolution
+            visited.add(destination)
+            current = destination
+
+    def find_shadowed_rules(self) -> list:
+        """Return (shadowed rule, earlier rule) pairs for rules which can never match."""
+        shadowed = []
+        first_static = {}
+        earlier_dynamic = []
+        for rule in self.rules:
+            if rule.is_dynamic:
+                for earlier in earlier_dynamic:
+                    if _covers(earlier, rule):
+                        shadowed.append((rule, earlier))
+                        break
+                earlier_dynamic.append(rule)
+                continue
+            earlier = first_static.get(rule.source)
+            if earlier is None:
+                earlier = next((dynamic for dynamic in earlier_dynamic if _covers(dynamic, rule)), None)
+            if earlier is not None:
+                shadowed.append((rule, earlier))
+            first_static.setdefault(rule.source, rule)
+        return shadowed
+
+
+def _covers(earlier: RedirectRule, later: RedirectRule) -> bool:
+    """Check if every path matched by the later rule is already matched by the earlier dynamic rule."""
+    earlier_segments, later_segments = earlier.segments, later.segments
+    for index, segment in enumerate(earlier_segments):
+        if segment == '*':
+            # the splat needs at least one (possibly empty) remaining segment
+            return len(later_segments) > index
+        if index >= len(later_segments):
+            return False
+        later_segment = later_segments[index]
+        if later_segment == '*':
+            return False
+        if segment.startswith(':'):
+            if later_segment == '':
+                return False
+        elif segment != later_segment:
+            return False
+    return len(earlier_segments) == len(later_segments)
+
+
+def check_config(resolver: RedirectResolver, config_file) -> list:
+    """
+    Check that every redirect of the JSON config ends up where the config leads, returns a list of problems.
+    Chains in the config (A -> B, B -> C) are followed, so a generated file with flattened chains (A -> C) matches.
+    """
+    # imported here, generate_redirects itself uses the resolver to compact the rules
+    from generate_redirects import normalize_destination, normalize_path
+
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+
+    config_rules = [
+        RedirectRule(normalize_path(redirect['old_link']), normalize_destination(redirect['new_link']),
+                     redirect.get('status_code', 301), line_number)
+        for line_number, redirect in enumerate(config.get('aws', []), start=1)
+        if redirect.get('_note') != "MANUALLY REVIEW AND UPDATE new_link"
+    ]
+    config_resolver = RedirectResolver(config_rules, max_hops=resolver.max_hops)
+
+    problems = []
+    for rule in config_rules:
+        expected = config_resolver.resolve(rule.source).final_destination
+        resolution = resolver.resolve(rule.source)
+        if not resolution.matched:
+            problems.append(f"{rule.source}: no matching rule (expected {expected})")
+        elif resolution.final_destination != expected:
+            problems.append(f"{rule.source}: redirects to {resolution.final_destination} (expected {expected})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a CloudFlare _redirects file offline')
+    parser.add_argument('--redirects', default='_redirects',
+                       help='Path to the _redirects file (default: _redirects)')
+    parser.add_argument('--config', default='redirects_config.json',
+                       help='JSON config file to check the rules against (default: redirects_config.json)')
+    parser.add_argument('--no-config', action='store_true',
+                       help='Skip checking the rules against the JSON config')
+    parser.add_argument('--max-hops', type=int, default=DEFAULT_MAX_HOPS,
+                       help=f'Maximum number of redirects to follow (default: {DEFAULT_MAX_HOPS})')
+
+    args = parser.parse_args()
+
+    if not Path(args.redirects).exists():
+        print(f"❌ Error: Redirects file '{args.redirects}' not found!")
+        return 1
+
+    start = time.perf_counter()
+    resolver = RedirectResolver(load_redirects(args.redirects), max_hops=args.max_hops)
+
+    loops, chains = [], []
+    hop_counts = Counter()
+    for rule in resolver.rules:
+        if rule.is_dynamic:
+            continue
+        resolution = resolver.resolve(rule.source)
+        hop_counts[len(resolution.hops)] += 1
+        if resolution.loop or resolution.too_many_hops:
+            loops.append(resolution)
+        elif len(resolution.hops) > 1:
+            chains.append(resolution)
+    shadowed = resolver.find_shadowed_rules()
+    config_problems = [] if args.no_config else check_config(resolver, args.config)
+    elapsed = time.perf_counter() - start
+
+    print(f"🔍 Checked {len(resolver.rules)} redirect rules in {elapsed * 1000:.1f}ms")
+    print(f"   Hops per rule: " + ", ".join(f"{hops}: {count}" for hops, count in sorted(hop_counts.items())))
+
+    for resolution in loops:
+        path = ' -> '.join([resolution.path] + [destination for _, destination in resolution.hops])
+        reason = 'loop' if resolution.loop else f'more than {args.max_hops} hops'
+        print(f"❌ Redirect {reason}: {path}")
+    for resolution in chains:
+        path = ' -> '.join([resolution.path] + [destination for _, destination in resolution.hops])
+        print(f"⚠️  {len(resolution.hops)}-hop chain: {path}")
+    for rule, earlier in shadowed:
+        print(f"⚠️  Line {rule.line_number} ({rule.source}) is shadowed by line {earlier.line_number} ({earlier.source})")
+    for problem in config_problems:
+        print(f"❌ Config mismatch: {problem}")
+
+    if loops or config_problems:
+        return 1
+
+    print(f"\n✅ No redirect loops" + ("" if args.no_config else " and all config redirects match"))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,63 @@
+"""
+Machine-readable store for redirect test results.
+Every outcome is appended to a JSONL file as soon as it is known, so interrupted runs can be resumed
+and previous failures can be re-tested without crawling the whole config again.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_RESULTS_FILE = 'redirect_test_results.jsonl'
+
+
+def redirect_hash(redirect: dict) -> str:
+    """Hash of a config entry, a result is only reused as long as the entry did not change."""
+    return hashlib.sha256(json.dumps(redirect, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class ResultStore:
+    """Append-only JSONL store of redirect test results, the latest result per entry wins."""
+
+    def __init__(self, results_file=DEFAULT_RESULTS_FILE):
+        self.results_file = Path(results_file)
+        self.lock = threading.Lock()
+        self._latest = {}
+        if self.results_file.exists():
+            with open(self.results_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # the last line of an interrupted run might be incomplete
+                        continue
+                    self._latest[self._key(record['staging_url'], record['product'], record['redirect_hash'])] = record
+        self._file = open(self.results_file, 'a')
+
+    @staticmethod
+    def _key(staging_url: str, product: str, entry_hash: str):
+        return staging_url, product, entry_hash
+
+    def previous(self, staging_url: str, product: str, redirect: dict):
+        """Return the latest recorded result of the config entry against the staging URL (or None)."""
+        return self._latest.get(self._key(staging_url, product, redirect_hash(redirect)))
+
+    def record(self, staging_url: str, redirect: dict, detail: dict):
+        """Append the result of a single test and flush it to disk."""
+        record = dict(detail, staging_url=staging_url, redirect_hash=redirect_hash(redirect),
+                      tested_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+        with self.lock:
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+            self._latest[self._key(staging_url, detail['product'], record['redirect_hash'])] = record
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
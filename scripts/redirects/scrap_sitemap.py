@@ -1,18 +1,168 @@
-from bs4 import BeautifulSoup
+#!/usr/bin/env python3
+"""
+Script to extract URLs from XML sitemaps.
+Follows sitemap index files, optionally checks that every discovered URL is alive (HEAD requests),
+and finds old URLs which are not mapped in the redirects config yet.
+"""
+
+import argparse
+import json
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
 import requests
 
-def get_urls_of_xml(xml_url):
-    r = requests.get(xml_url)
-    xml = r.text
-    soup = BeautifulSoup(xml)
+DEFAULT_SITEMAP_URL = "https://snowflake.localstack.cloud/sitemap.xml"
+
+
+def _local_name(tag: str) -> str:
+    # strip the XML namespace, e.g. "{http://www.sitemaps.org/schemas/sitemap/0.9}loc" -> "loc"
+    return tag.rsplit('}', 1)[-1]
+
+
+def _open_sitemap(sitemap_url: str, session: requests.Session, timeout: int):
+    """Open a sitemap as a binary stream, local files are supported for offline runs."""
+    parsed = urlparse(sitemap_url)
+    if parsed.scheme in ('http', 'https'):
+        response = session.get(sitemap_url, stream=True, timeout=timeout)
+        response.raise_for_status()
+        # let urllib3 take care of gzip / deflate encoded responses
+        response.raw.decode_content = True
+        return response.raw
+    return open(parsed.path if parsed.scheme == 'file' else sitemap_url, 'rb')
+
+
+def iter_sitemap_urls(sitemap_url: str, session: requests.Session = None, timeout: int = 10):
+    """
+    Yield the page URLs of a sitemap, sitemap index files are followed recursively.
+    The XML is parsed incrementally, so large sitemaps are never loaded into memory completely.
+    """
+    session = session or requests.Session()
+    pending = [sitemap_url]
+    visited = set()
+    while pending:
+        current = pending.pop(0)
+        if current in visited:
+            continue
+        visited.add(current)
+        with _open_sitemap(current, session, timeout) as stream:
+            is_index = False
+            for event, element in ET.iterparse(stream, events=('start', 'end')):
+                name = _local_name(element.tag)
+                if event == 'start':
+                    if name == 'sitemapindex':
+                        is_index = True
+                    continue
+                if name == 'loc' and element.text:
+                    loc = urljoin(current, element.text.strip())
+                    if is_index:
+                        pending.append(loc)
+                    else:
+                        yield loc
+                elif name in ('url', 'sitemap'):
+                    # free the parsed entries, only the current one is needed
+                    element.clear()
+
+
+def create_session(concurrency: int = 1) -> requests.Session:
+    """Session with a connection pool large enough for the given concurrency."""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'LocalStack-Redirect-Tester/1.0'
+    })
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def check_urls(urls, session: requests.Session = None, concurrency: int = 8, timeout: int = 10):
+    """Check the URLs with concurrent HEAD requests, yields (url, status code) in the order of the URLs (0 on errors)."""
+    session = session or create_session(concurrency)
+
+    def head(url):
+        try:
+            return url, session.head(url, allow_redirects=True, timeout=timeout).status_code
+        except requests.exceptions.RequestException:
+            return url, 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        yield from executor.map(head, urls)
+
+
+def to_path(url: str) -> str:
+    """Path of a URL, as used for the old_link entries of the redirects config."""
+    return urlparse(url).path or '/'
+
+
+def find_unmapped_urls(urls, config_file, product: str = 'aws') -> list:
+    """Return the URLs whose path is not an old_link of the product in the redirects config."""
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+
+    def normalize(path):
+        # trailing slashes do not matter for the comparison
+        return '/' + path.strip('/')
+
+    mapped = {normalize(to_path(redirect['old_link'])) for redirect in config.get(product, [])}
+    return [url for url in urls if normalize(to_path(url)) not in mapped]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract URLs from an XML sitemap')
+    parser.add_argument('sitemap', nargs='?', default=DEFAULT_SITEMAP_URL,
+                       help=f'Sitemap URL or local file (default: {DEFAULT_SITEMAP_URL})')
+    parser.add_argument('--output',
+                       help='Write the URLs to this file (e.g. aws_urls.txt) instead of printing them')
+    parser.add_argument('--paths', action='store_true',
+                       help='Only write the paths of the URLs (like aws_urls.txt)')
+    parser.add_argument('--check', action='store_true',
+                       help='Check every URL with a HEAD request and report the broken ones')
+    parser.add_argument('--concurrency', type=int, default=8,
+                       help='Number of parallel HEAD requests (default: 8)')
+    parser.add_argument('--timeout', type=int, default=10,
+                       help='Request timeout in seconds (default: 10)')
+    parser.add_argument('--config',
+                       help='Redirects config to find URLs without a redirect (e.g. redirects_config.json)')
+    parser.add_argument('--product', default='aws',
+                       help='Product of the redirects config to compare against (default: aws)')
+
+    args = parser.parse_args()
+
+    session = create_session(args.concurrency)
+    urls = list(iter_sitemap_urls(args.sitemap, session, args.timeout))
+    lines = [to_path(url) if args.paths else url for url in urls]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.writelines(f"{line}\n" for line in lines)
+        print(f"✅ Wrote {len(lines)} URLs to {args.output}")
+    else:
+        for line in lines:
+            print(line)
+
+    exit_code = 0
+    if args.check:
+        broken = [(url, status) for url, status in check_urls(urls, session, args.concurrency, args.timeout)
+                  if not 200 <= status < 400]
+        print(f"\n🔍 Checked {len(urls)} URLs, {len(broken)} broken")
+        for url, status in broken:
+            print(f"  ❌ {status or 'error'}: {url}")
+        exit_code = 1 if broken else 0
+
+    if args.config:
+        if not Path(args.config).exists():
+            print(f"❌ Error: Config file '{args.config}' not found!")
+            return 1
+        unmapped = find_unmapped_urls(urls, args.config, args.product)
+        print(f"\n🗺️  {len(unmapped)} of {len(urls)} URLs have no redirect in {args.config}")
+        for url in unmapped:
+            print(f"  ⚠️  {url}")
 
-    links_arr = []
-    for link in soup.findAll('loc'):
-        linkstr = link.getText('', True)
-        links_arr.append(linkstr)
+    return exit_code
 
-    return links_arr
 
-links_data_arr = get_urls_of_xml("https://snowflake.localstack.cloud/sitemap.xml")
-for link in links_data_arr:
-    print(f"{link}")
+if __name__ == "__main__":
+    exit(main())
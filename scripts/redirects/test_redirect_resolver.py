@@ -0,0 +1,82 @@
+"""
+Tests of the offline resolver (redirect_resolver.py) and the rule compaction (redirect_compaction.py),
+run with: python -m pytest test_redirect_resolver.py
+"""
+
+import json
+
+from generate_redirects import generate_redirects_file
+from redirect_compaction import compact_rules
+from redirect_resolver import RedirectResolver, check_config, load_redirects, parse_redirects
+
+
+def _write_config(tmp_path, redirects):
+    config_file = tmp_path / 'redirects_config.json'
+    config_file.write_text(json.dumps({
+        'aws': [{'old_link': old, 'new_link': new, 'status_code': 301} for old, new in redirects],
+    }))
+    return config_file
+
+
+def test_resolve_follows_chain():
+    resolver = RedirectResolver(parse_redirects(['/a/ /b/ 301', '/b/ /c/ 301']))
+    resolution = resolver.resolve('/a/')
+    assert resolution.final_destination == '/c/'
+    assert len(resolution.hops) == 2
+
+
+def test_check_config_accepts_flattened_chain(tmp_path):
+    config_file = _write_config(tmp_path, [('/a/', '/b/'), ('/b/', '/c/')])
+    redirects_file = tmp_path / '_redirects'
+    generate_redirects_file(config_file, redirects_file)
+
+    rules = load_redirects(redirects_file)
+    # the chain was flattened, /a/ points to the final target directly
+    assert [str(rule) for rule in rules] == ['/a/ /c/ 301', '/b/ /c/ 301']
+    assert check_config(RedirectResolver(rules), config_file) == []
+
+
+def test_check_config_reports_mismatch(tmp_path):
+    config_file = _write_config(tmp_path, [('/a/', '/b/'), ('/b/', '/c/'), ('/d/', '/e/')])
+    resolver = RedirectResolver(parse_redirects(['/a/ /x/ 301', '/b/ /c/ 301']))
+
+    assert check_config(resolver, config_file) == [
+        '/a/: redirects to /x/ (expected /c/)',
+        '/d/: no matching rule (expected /e/)',
+    ]
+
+
+def test_compact_rules_merges_siblings_into_placeholder_rule():
+    rules = parse_redirects([
+        '/user-guide/aws/s3/ /aws/services/s3/ 301',
+        '/user-guide/aws/sqs/ /aws/services/sqs/ 301',
+        '/user-guide/aws/sns/ /aws/services/sns/ 301',
+        # an exception of the group has to stay
+        '/user-guide/aws/lambda/ /aws/services/lambda-functions/ 301',
+        '/user-guide/aws/:service/ /aws/services/:service/ 301',
+    ])
+
+    compacted, stats = compact_rules(rules, merge_siblings=True)
+
+    assert [str(rule) for rule in compacted] == [
+        '/user-guide/aws/lambda/ /aws/services/lambda-functions/ 301',
+        '/user-guide/aws/:service/ /aws/services/:service/ 301',
+    ]
+    assert stats.merged == 3
+    original, merged = RedirectResolver(rules), RedirectResolver(compacted)
+    for path in ['/user-guide/aws/s3/', '/user-guide/aws/lambda/', '/user-guide/aws/other/', '/user-guide/other/']:
+        assert merged.resolve(path).final_destination == original.resolve(path).final_destination
+
+
+def test_compact_rules_does_not_add_placeholder_rules():
+    # without a placeholder rule, merging would start to redirect paths which 404 today
+    rules = parse_redirects([
+        '/user-guide/aws/s3/ /aws/services/s3/ 301',
+        '/user-guide/aws/sqs/ /aws/services/sqs/ 301',
+        '/user-guide/aws/sns/ /aws/services/sns/ 301',
+    ])
+
+    compacted, stats = compact_rules(rules, merge_siblings=True)
+
+    assert compacted == rules
+    assert stats.merged == 0
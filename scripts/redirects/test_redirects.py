@@ -7,20 +7,89 @@ Uses the staging environment to test the redirect behavior.
 import json
 import requests
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, urljoin
 from pathlib import Path
+import tempfile
 import time
 from typing import List, Tuple
 
+from redirect_report import JsonlReportWriter, JUnitReportWriter, MarkdownReportWriter, MultiReportWriter
+from redirect_results import DEFAULT_RESULTS_FILE, ResultStore
+
+
+DETAIL_FIELDS = ('product', 'old_url', 'expected_new_url', 'final_url', 'status_code', 'success', 'message')
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter: allows `rate` requests per second, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class RedirectTester:
-    def __init__(self, staging_base_url: str, timeout: int = 10):
+    def __init__(self, staging_base_url: str, timeout: int = 10, concurrency: int = 1, rate: float = 2.0,
+                 follow_external: bool = True):
+        """
+        Args:
+            staging_base_url: Base URL of the environment to test
+            timeout: Request timeout in seconds
+            concurrency: Number of redirects tested in parallel
+            rate: Maximum number of redirects tested per second (0 for no limit)
+            follow_external: Whether redirects to other hosts are followed, otherwise the external
+                redirect target is the final URL
+        """
         self.staging_base_url = staging_base_url.rstrip('/')
         self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = TokenBucket(rate, capacity=self.concurrency)
+        self.follow_external = follow_external
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'LocalStack-Redirect-Tester/1.0'
         })
+        # allow one pooled connection per worker
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _get(self, url: str) -> requests.Response:
+        """GET the url following redirects, only within the staging host unless follow_external is set."""
+        if self.follow_external:
+            return self.session.get(url, allow_redirects=True, timeout=self.timeout)
+
+        staging_netloc = urlparse(self.staging_base_url).netloc
+        for _ in range(self.session.max_redirects):
+            response = self.session.get(url, allow_redirects=False, timeout=self.timeout)
+            if not response.is_redirect:
+                return response
+            url = urljoin(response.url, response.headers['Location'])
+            if urlparse(url).netloc != staging_netloc:
+                # do not leave the staging environment, the external target is the result
+                response.url = url
+                return response
+        raise requests.exceptions.TooManyRedirects(f"Exceeded {self.session.max_redirects} redirects")
     
     def test_redirect(self, old_path: str, expected_new_path: str) -> Tuple[bool, str, int, str]:
         """
@@ -38,11 +107,7 @@ class RedirectTester:
             staging_url = f"{self.staging_base_url}{old_path}"
             
             # Make request with redirect following
-            response = self.session.get(
-                staging_url, 
-                allow_redirects=True, 
-                timeout=self.timeout
-            )
+            response = self._get(staging_url)
             
             final_url = response.url
             status_code = response.status_code
@@ -79,8 +144,18 @@ class RedirectTester:
         except Exception as e:
             return False, "", 0, f"💥 Unexpected error: {str(e)}"
 
-    def test_all_redirects(self, config_file: Path) -> dict:
-        """Test all redirects from the config file."""
+    def test_all_redirects(self, config_file: Path, results_store: ResultStore = None, resume: bool = False,
+                           only_failed: bool = False, report_writer=None) -> dict:
+        """
+        Test all redirects from the config file.
+
+        Args:
+            config_file: JSON config file with the redirects
+            results_store: Store which records every result as soon as it is known
+            resume: Reuse passed results of a previous run against the same staging URL
+            only_failed: Only re-test the redirects which failed in a previous run
+            report_writer: Report writer which gets every test detail as soon as it is known
+        """
         
         with open(config_file, 'r') as f:
             config = json.load(f)
@@ -100,34 +175,39 @@ class RedirectTester:
             
             if skipped_aws > 0:
                 print(f"  ⏭️  Skipping {skipped_aws} AWS redirects with manual review notes")
-            
-            for i, redirect in enumerate(aws_redirects, 1):
-                old_path = redirect['old_link']
-                new_path = redirect['new_link']
-                
-                print(f"  [{i}] Testing: {old_path}")
-                success, final_url, status_code, message = self.test_redirect(old_path, new_path)
+
+            # pairs of redirect and a reusable previous result (None if the redirect needs to be tested)
+            plan = [(redirect, None) for redirect in aws_redirects]
+            if results_store and (resume or only_failed):
+                plan = []
+                for redirect in aws_redirects:
+                    previous = results_store.previous(self.staging_base_url, 'aws', redirect)
+                    if previous and previous['success']:
+                        plan.append((redirect, previous))
+                    elif previous or not only_failed:
+                        plan.append((redirect, None))
+                reused = sum(1 for _, previous in plan if previous)
+                print(f"  ⏭️  Reusing {reused} passed results of a previous run, testing {len(plan) - reused} redirects")
+
+            to_test = [redirect for redirect, previous in plan if previous is None]
+            outcomes = self._test_redirects(to_test, 'aws', results_store)
+            for i, (redirect, previous) in enumerate(plan, 1):
+                if previous:
+                    detail = {key: previous[key] for key in DETAIL_FIELDS}
+                else:
+                    print(f"  [{i}] Testing: {redirect['old_link']}")
+                    detail = next(outcomes)
+                    print(f"      {detail['message']}")
                 
                 results['total'] += 1
-                if success:
+                if detail['success']:
                     results['passed'] += 1
-                    print(f"      {message}")
                 else:
                     results['failed'] += 1
-                    print(f"      {message}")
-                
-                results['details'].append({
-                    'product': 'aws',
-                    'old_url': old_path,
-                    'expected_new_url': new_path,
-                    'final_url': final_url,
-                    'status_code': status_code,
-                    'success': success,
-                    'message': message
-                })
                 
-                # Small delay to be respectful
-                time.sleep(0.5)
+                results['details'].append(detail)
+                if report_writer:
+                    report_writer.add(detail)
         
                  # Test Snowflake redirects
         # if 'snowflake' in config:
@@ -168,49 +248,45 @@ class RedirectTester:
         
         return results
 
+    def _test_entry(self, redirect: dict, product: str, results_store: ResultStore = None) -> dict:
+        # limit the request rate to be respectful
+        self.rate_limiter.acquire()
+        success, final_url, status_code, message = self.test_redirect(redirect['old_link'], redirect['new_link'])
+        detail = {
+            'product': product,
+            'old_url': redirect['old_link'],
+            'expected_new_url': redirect['new_link'],
+            'final_url': final_url,
+            'status_code': status_code,
+            'success': success,
+            'message': message
+        }
+        if results_store:
+            # persist the result right away, so an interrupted run can be resumed
+            results_store.record(self.staging_base_url, redirect, detail)
+        return detail
+
+    def _test_redirects(self, redirects: List[dict], product: str, results_store: ResultStore = None):
+        """Tests the redirects with the configured concurrency, yields the details in the order of the redirects."""
+        if self.concurrency == 1:
+            for redirect in redirects:
+                yield self._test_entry(redirect, product, results_store)
+            return
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            yield from executor.map(lambda redirect: self._test_entry(redirect, product, results_store), redirects)
+
     def generate_report(self, results: dict, output_file: str = None):
-        """Generate a detailed test report."""
-        
-        report = []
-        report.append("# LocalStack Redirect Test Report")
-        report.append(f"**Generated:** {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append(f"**Staging URL:** {self.staging_base_url}")
-        report.append("")
-        report.append("## Summary")
-        report.append(f"- **Total tests:** {results['total']}")
-        report.append(f"- **Passed:** {results['passed']} ✅")
-        report.append(f"- **Failed:** {results['failed']} ❌")
-        report.append(f"- **Success rate:** {(results['passed'] / results['total'] * 100):.1f}%" if results['total'] > 0 else "- **Success rate:** N/A")
-        report.append("")
-        
-        if results['failed'] > 0:
-            report.append("## Failed Tests")
+        """Generate a detailed markdown test report, returned as text (and saved if an output file is given)."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report_file = Path(output_file) if output_file else Path(tmp_dir) / 'report.md'
+            writer = MarkdownReportWriter(report_file, self.staging_base_url)
             for detail in results['details']:
-                if not detail['success']:
-                    report.append(f"### {detail['product'].upper()}: {detail['old_url']}")
-                    report.append(f"- **Expected:** {detail['expected_new_url']}")
-                    report.append(f"- **Got:** {detail['final_url']}")
-                    report.append(f"- **Status:** {detail['status_code']}")
-                    report.append(f"- **Message:** {detail['message']}")
-                    report.append("")
-        
-        report.append("## All Test Details")
-        for detail in results['details']:
-            status_icon = "✅" if detail['success'] else "❌"
-            report.append(f"### {status_icon} {detail['product'].upper()}: {detail['old_url']}")
-            report.append(f"- **Expected:** {detail['expected_new_url']}")
-            report.append(f"- **Final URL:** {detail['final_url']}")
-            report.append(f"- **Status Code:** {detail['status_code']}")
-            report.append(f"- **Message:** {detail['message']}")
-            report.append("")
-        
-        report_text = "\n".join(report)
-        
+                writer.add(detail)
+            writer.close()
+            report_text = report_file.read_text(encoding='utf-8')
+
         if output_file:
-            with open(output_file, 'w') as f:
-                f.write(report_text)
             print(f"\n📋 Detailed report saved to: {output_file}")
-        
         return report_text
 
 
@@ -224,6 +300,24 @@ def main():
                        help='Request timeout in seconds (default: 10)')
     parser.add_argument('--report', 
                        help='Save detailed report to file (optional)')
+    parser.add_argument('--report-jsonl',
+                       help='Save the test details as JSON lines to file (optional)')
+    parser.add_argument('--report-junit',
+                       help='Save the test results as JUnit XML to file (optional)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                       help='Number of redirects tested in parallel (default: 1)')
+    parser.add_argument('--rate', type=float, default=2.0,
+                       help='Maximum number of requests per second, 0 for no limit (default: 2)')
+    parser.add_argument('--no-follow-external', action='store_true',
+                       help='Do not follow redirects to other hosts, the external target is the final URL')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_FILE,
+                       help=f'JSONL file recording every test result (default: {DEFAULT_RESULTS_FILE})')
+    parser.add_argument('--no-results', action='store_true',
+                       help='Do not record the test results')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip redirects which already passed against the same staging URL')
+    parser.add_argument('--only-failed', action='store_true',
+                       help='Only re-test redirects which failed in a previous run against the same staging URL')
     
     args = parser.parse_args()
     
@@ -236,10 +330,27 @@ def main():
     print(f"📍 Staging URL: {args.staging_url}")
     print(f"⚙️  Config file: {config_path}")
     
-    tester = RedirectTester(args.staging_url, args.timeout)
+    tester = RedirectTester(args.staging_url, args.timeout, concurrency=args.concurrency, rate=args.rate,
+                            follow_external=not args.no_follow_external)
+    
+    if args.no_results and (args.resume or args.only_failed):
+        print(f"❌ Error: --resume and --only-failed need the recorded results")
+        return 1
+    results_store = None if args.no_results else ResultStore(args.results)
+    # all reports are written while the tests run, in a single pass over the results
+    report_writer = MultiReportWriter(
+        writer_class(output_file, tester.staging_base_url)
+        for writer_class, output_file in (
+            (MarkdownReportWriter, args.report),
+            (JsonlReportWriter, args.report_jsonl),
+            (JUnitReportWriter, args.report_junit),
+        )
+        if output_file
+    )
     
     try:
-        results = tester.test_all_redirects(config_path)
+        results = tester.test_all_redirects(config_path, results_store, resume=args.resume,
+                                            only_failed=args.only_failed, report_writer=report_writer)
         
         print(f"\n" + "="*50)
         print(f"📊 TEST RESULTS SUMMARY")
@@ -252,8 +363,9 @@ def main():
             success_rate = results['passed'] / results['total'] * 100
             print(f"Success rate: {success_rate:.1f}%")
             
-            if args.report:
-                tester.generate_report(results, args.report)
+            for output_file in (args.report, args.report_jsonl, args.report_junit):
+                if output_file:
+                    print(f"\n📋 Detailed report saved to: {output_file}")
             
             return 0 if results['failed'] == 0 else 1
         else:
@@ -263,6 +375,11 @@ def main():
     except Exception as e:
         print(f"💥 Error running tests: {e}")
         return 1
+    finally:
+        # the reports are finished even if the run failed or was interrupted, with the tests run so far
+        report_writer.close()
+        if results_store:
+            results_store.close()
 
 
 if __name__ == "__main__":
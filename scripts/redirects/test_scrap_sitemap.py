@@ -0,0 +1,126 @@
+"""
+Tests of scrap_sitemap.py against the local fixture sitemaps, run with: python -m pytest test_scrap_sitemap.py
+No network access is needed, URLs are checked against a local redirect server.
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from local_redirect_server import serve_redirects
+from scrap_sitemap import check_urls, find_unmapped_urls, iter_sitemap_urls, to_path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+FIXTURE_PATHS = [
+    '/user-guide/aws/s3/',
+    '/user-guide/aws/sqs/',
+    '/getting-started/installation/',
+    '/references/coverage/coverage_s3/',
+    '/user-guide/not-mapped-yet/',
+]
+
+
+class _QuietFileHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def test_iter_sitemap_urls_follows_index():
+    # the relative locations of the index are resolved against the index, the sitemaps are read in order
+    urls = list(iter_sitemap_urls(str(FIXTURES_DIR / 'sitemap-index.xml')))
+    assert [to_path(url) for url in urls] == FIXTURE_PATHS
+
+
+def test_iter_sitemap_urls_resolves_relative_locs():
+    # served over HTTP, the relative locations resolve to URLs of the same host
+    handler = partial(_QuietFileHandler, directory=str(FIXTURES_DIR))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        urls = list(iter_sitemap_urls(f"{base_url}/sitemap-index.xml"))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert urls == [base_url + path for path in FIXTURE_PATHS]
+
+
+def test_iter_sitemap_urls_visits_sitemaps_once(tmp_path):
+    index = tmp_path / 'sitemap-index.xml'
+    index.write_text(
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f'<sitemap><loc>{FIXTURES_DIR / "sitemap-0.xml"}</loc></sitemap>'
+        f'<sitemap><loc>{FIXTURES_DIR / "sitemap-0.xml"}</loc></sitemap>'
+        '</sitemapindex>'
+    )
+    assert [to_path(url) for url in iter_sitemap_urls(str(index))] == FIXTURE_PATHS[:3]
+
+
+def test_find_unmapped_urls(tmp_path):
+    config_file = tmp_path / 'redirects_config.json'
+    config_file.write_text(json.dumps({
+        'aws': [
+            # trailing slashes do not matter
+            {'old_link': '/user-guide/aws/s3', 'new_link': '/aws/services/s3', 'status_code': 301},
+            {'old_link': '/user-guide/aws/sqs/', 'new_link': '/aws/services/sqs', 'status_code': 301},
+            {'old_link': '/getting-started/installation/', 'new_link': '/aws/getting-started/installation',
+             'status_code': 301},
+        ],
+        'snowflake': [
+            {'old_link': '/user-guide/not-mapped-yet/', 'new_link': '/snowflake/', 'status_code': 301},
+        ],
+    }))
+    urls = list(iter_sitemap_urls(str(FIXTURES_DIR / 'sitemap-index.xml')))
+
+    assert [to_path(url) for url in find_unmapped_urls(urls, config_file)] == FIXTURE_PATHS[3:]
+    assert [to_path(url) for url in find_unmapped_urls(urls, config_file, 'snowflake')] == FIXTURE_PATHS[:4]
+
+
+def test_check_urls(tmp_path):
+    redirects_file = tmp_path / '_redirects'
+    redirects_file.write_text('/user-guide/aws/s3/ /aws/services/s3 301\n')
+
+    with serve_redirects(redirects_file) as base_url:
+        urls = [base_url + path for path in FIXTURE_PATHS[:2]]
+        # nothing listens on port 9 (discard), connection errors are reported as 0
+        urls.append('http://127.0.0.1:9/user-guide/aws/s3/')
+        results = list(check_urls(urls, concurrency=2, timeout=2))
+
+    # redirects are followed, the results keep the order of the URLs
+    assert results == [(urls[0], 200), (urls[1], 200), (urls[2], 0)]
+
+
+def test_serve_redirects_matches_dynamic_rules(tmp_path):
+    redirects_file = tmp_path / '_redirects'
+    redirects_file.write_text(
+        '/user-guide/aws/s3/ /aws/services/s3/ 301\n'
+        '/user-guide/aws/:service/ /aws/services/:service/ 301\n'
+        '/references/* /aws/references/:splat 302\n'
+    )
+
+    with serve_redirects(redirects_file) as base_url:
+        opener = urllib.request.build_opener(_NoRedirectHandler)
+        responses = {}
+        for path in ['/user-guide/aws/s3/', '/user-guide/aws/sqs/', '/references/coverage/coverage_s3/',
+                     '/getting-started/installation/']:
+            try:
+                with opener.open(base_url + path) as response:
+                    responses[path] = (response.status, None)
+            except urllib.error.HTTPError as e:
+                responses[path] = (e.code, e.headers['Location'])
+
+    assert responses == {
+        '/user-guide/aws/s3/': (301, '/aws/services/s3/'),
+        '/user-guide/aws/sqs/': (301, '/aws/services/sqs/'),
+        '/references/coverage/coverage_s3/': (302, '/aws/references/coverage/coverage_s3/'),
+        '/getting-started/installation/': (200, None),
+    }
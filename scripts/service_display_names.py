@@ -0,0 +1,36 @@
+"""
+Lookup of the display names of services, shared by the docs generators
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+
+DEFAULT_SERVICE_DISPLAY_NAMES = Path(__file__).resolve().parents[1].joinpath(
+    "src", "data", "coverage", "service_display_name.json"
+)
+
+
+@lru_cache(maxsize=None)
+def load_service_display_names(service_lookup: str = str(DEFAULT_SERVICE_DISPLAY_NAMES)) -> dict:
+    """
+    Loads the service_display_name.json, the file is only read once per path.
+    Returns an empty dict if the file does not exist.
+    """
+    service_lookup = Path(service_lookup)
+    if service_lookup.exists() and service_lookup.is_file():
+        with open(service_lookup, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def lookup_full_name(shortname: str, service_lookup: str = str(DEFAULT_SERVICE_DISPLAY_NAMES)) -> str:
+    """Given the short default name of a service, looks up for the full name"""
+    service_info = load_service_display_names(str(service_lookup))
+
+    service_name_title = shortname
+
+    if service_name_details := service_info.get(shortname, {}):
+        service_name_title = service_name_details.get("long_name", shortname)
+        if service_name_title and (short_name := service_name_details.get("short_name")):
+            service_name_title = f"{short_name} ({service_name_title})"
+    return service_name_title
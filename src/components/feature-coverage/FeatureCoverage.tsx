@@ -73,9 +73,13 @@ export default function PersistenceCoverage({ service }: { service: string }) {
 
   React.useEffect(() => {
     const loadData = async () => {
-      const moduleData = (await jsonData[
-        `/src/data/coverage/${service}.json`
-      ]()) as { default: Record<string, any> };
+      // the summary (if generated) only contains the operations, and avoids loading all test details
+      const loadModule =
+        jsonData[`/src/data/coverage/${service}.summary.json`] ??
+        jsonData[`/src/data/coverage/${service}.json`];
+      const moduleData = (await loadModule()) as {
+        default: Record<string, any>;
+      };
       setCoverage(moduleData.default.operations);
     };
     loadData();